@@ -0,0 +1,88 @@
+import argparse
+import contextlib
+import json
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+
+def find_workspaces(root):
+    # Cada subpasta com um config.yml é um cliente (workspace) independente
+    return sorted(path.parent for path in Path(root).glob("*/config.yml"))
+
+
+def run_workspace(workspace, force=False, from_stage=None):
+    # Executado num processo do pool; a saída do pipeline vai para o log do próprio workspace
+    from run_pipeline import run
+
+    workspace = Path(workspace)
+    log_path = workspace / "outputs" / "pipeline.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    result = {"workspace": str(workspace), "status": "ok", "error": None, "log": str(log_path)}
+    with open(log_path, "a", encoding="utf-8") as log:
+        log.write(f"\n=== {datetime.now().isoformat(timespec='seconds')} ===\n")
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            try:
+                run(workspace, force=force, from_stage=from_stage)
+            except Exception as exc:
+                traceback.print_exc()
+                result.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def run_batch(root, workers=4, force=False, from_stage=None):
+    workspaces = find_workspaces(root)
+    if not workspaces:
+        raise FileNotFoundError(f"Nenhum workspace com config.yml encontrado em: {root}")
+
+    print(f"=== 🗂️ Processando {len(workspaces)} workspaces com {workers} processos ===")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_workspace, workspace, force, from_stage): workspace
+            for workspace in workspaces
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:
+                # Falha do próprio processo (ex.: morto pelo sistema); os demais workspaces continuam
+                result = {"workspace": str(futures[future]), "status": "error", "error": repr(exc), "seconds": None}
+            icon = "✅" if result["status"] == "ok" else "❌"
+            print(f"{icon} {result['workspace']} ({result['seconds']}s){' - ' + result['error'] if result['error'] else ''}")
+            results.append(result)
+
+    results.sort(key=lambda result: result["workspace"])
+    summary = {
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "total": len(results),
+        "ok": sum(result["status"] == "ok" for result in results),
+        "failed": sum(result["status"] != "ok" for result in results),
+        "workspaces": results,
+    }
+    summary_path = Path(root) / "batch_summary.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"=== 📋 {summary['ok']}/{summary['total']} workspaces ok, {summary['failed']} com erro. Resumo: {summary_path} ===")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa o pipeline para vários workspaces (clientes) em paralelo")
+    parser.add_argument("root", help="Pasta com um subdiretório por cliente, cada um com config.yml e statements/")
+    parser.add_argument("--workers", type=int, default=4, help="Workspaces processados simultaneamente (padrão: 4)")
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--from-stage", choices=["extract", "reconcile", "build", "format"])
+    args = parser.parse_args()
+
+    summary = run_batch(args.root, args.workers, args.force, args.from_stage)
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
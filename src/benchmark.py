@@ -0,0 +1,370 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import yaml
+
+HISTORY_PATH = Path("outputs/benchmarks/history.json")
+BANKS = ("c6", "bradesco", "itau_csv", "itau_pdf", "itau_pdf_layout")
+# Dependências pesadas que não podem ser carregadas só para montar a CLI (--help, etapas puladas)
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "pdfplumber", "pyarrow")
+
+
+def br_amount(value):
+    return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def synthetic_rows(n, seed):
+    # Lançamentos espalhados do início do ano até hoje, com saldo acumulado
+    rng = random.Random(seed)
+    start = date(date.today().year, 1, 1)
+    span = max((date.today() - start).days, 1)
+    balance = 1000.0
+    rows = []
+    for i in range(n):
+        day = start + timedelta(days=span * i // n)
+        amount = round(rng.uniform(5, 3000), 2) * (1 if rng.random() < 0.4 else -1)
+        balance = round(balance + amount, 2)
+        rows.append((day, f"PIX TRANSF {i} FULANO", amount, balance))
+    return rows
+
+
+def generate_c6_csv(path, n, seed=1):
+    rows = synthetic_rows(n, seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\ufeffEXTRATO DE CONTA CORRENTE C6 BANK\n\nAgência: 0 / Conta: 0\n\n")
+        f.write("Data Lançamento,Data Contábil,Título,Descrição,Entrada(R$),Saída(R$),Saldo do Dia(R$)\n")
+        for day, description, amount, balance in rows:
+            d = day.strftime("%d/%m/%Y")
+            inflow = f"{amount:.2f}" if amount > 0 else "0.00"
+            outflow = f"{-amount:.2f}" if amount < 0 else "0.00"
+            f.write(f"{d},{d},{description},{description},{inflow},{outflow},{balance:.2f}\n")
+
+
+def generate_bradesco_csv(path, n, seed=2):
+    rows = synthetic_rows(n, seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Extrato de: Agência: 0 | Conta: 0\n")
+        f.write("Data;Histórico;Docto.;Crédito (R$);Débito (R$);Saldo (R$)\n")
+        for i, (day, description, amount, balance) in enumerate(rows):
+            inflow = br_amount(amount) if amount > 0 else ""
+            outflow = br_amount(-amount) if amount < 0 else ""
+            f.write(f"{day.strftime('%d/%m/%Y')};{description};{i};{inflow};{outflow};{br_amount(balance)}\n")
+
+
+def generate_itau_csv(path, n, seed=3):
+    rows = synthetic_rows(n, seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Data;Histórico;Valor\n")
+        for day, description, amount, _ in rows:
+            f.write(f"{day.strftime('%d/%m/%Y')};{description};{br_amount(amount)}\n")
+
+
+def helvetica_width(text, size):
+    # Largura (pt) de um valor numérico em Helvetica, para alinhar à direita como no extrato real
+    widths = {",": 278, ".": 278, "-": 333}
+    return sum(widths.get(char, 556) for char in text) * size / 1000
+
+
+def generate_itau_pdf(path, n, seed=4, lines_per_page=60):
+    # PDF mínimo escrito à mão, sem depender de bibliotecas extras, no layout do extrato do Itaú:
+    # cabeçalho em cada página, data e lançamento alinhados à esquerda, valor e saldo à direita
+    lines = []
+    for day, description, amount, balance in synthetic_rows(n, seed):
+        lines.append([(30, day.strftime("%d/%m/%Y")), (95, description), (470, br_amount(amount), "right")])
+        lines.append([(30, day.strftime("%d/%m/%Y")), (95, "SALDO DO DIA"), (565, br_amount(balance), "right")])
+    header = [(30, "Data"), (95, "Lançamentos"), (432, "Valor (R$)"), (527, "Saldo (R$)")]
+    rows_per_page = lines_per_page - 1
+    pages = [[header] + lines[i:i + rows_per_page] for i in range(0, len(lines), rows_per_page)] or [[header]]
+
+    objects = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for pid, page_lines in zip(page_ids, pages):
+        cells = []
+        for number, line in enumerate(page_lines):
+            y = 810 - 12 * number
+            for x, text, *align in line:
+                if align:
+                    x -= helvetica_width(text, 9)
+                escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+                cells.append(f"1 0 0 1 {x:.2f} {y} Tm ({escaped}) Tj")
+        stream = f"BT /F1 9 Tf {' '.join(cells)} ET".encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def synthetic_config(cards, recurring):
+    palette = [["#f79645", "#fce5cd", "#f9cb9c"], ["#f80002", "#f4cccc", "#ea9999"], ["#999999", "#d9d9d9", "#cccccc"]]
+    banks = ["itau", "bradesco", "c6"]
+    return {
+        "accounts": [
+            {"name": "c6", "bank": "c6", "format": "csv", "files": "statements/c6/*.csv"},
+            {"name": "bradesco", "bank": "bradesco", "format": "csv", "files": "statements/bradesco/*.csv"},
+            {"name": "itau", "bank": "itau", "format": "pdf", "files": "statements/itau/*.pdf"},
+        ],
+        "cache": {"enabled": False},
+        "storage": {"format": "parquet", "csv_export": False},
+        "cards": [
+            {
+                "bank": banks[i % 3], "name": f"cartao{i}", "last_digits": f"{1000 + i}",
+                "due_day": 1 + (i * 7) % 28, "color": palette[i % 3],
+            }
+            for i in range(cards)
+        ],
+        "fixed_income": [
+            {"name": f"receita{i}", "day": 1 + i % 31, "amount": 100.0 + i, "account": "itau"}
+            for i in range(recurring // 2)
+        ],
+        "fixed_expenses": [
+            {"name": f"despesa{i}", "day": 1 + (i * 3) % 31, "amount": 50.0 + i, "account": "c6"}
+            for i in range(recurring - recurring // 2)
+        ],
+    }
+
+
+# O tracemalloc deixa etapas com muitas alocações (pdfminer) bem mais lentas; --no-memory desliga
+TRACE_MEMORY = True
+# Perguntas "e se" medidas por execução (mudança de um item fixo + saldo no fim do horizonte)
+WHAT_IF_QUERIES = 2000
+
+
+def measure(results, stage, rows, func):
+    if TRACE_MEMORY:
+        tracemalloc.start()
+    started = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - started
+    peak_mb = None
+    if TRACE_MEMORY:
+        peak_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+        tracemalloc.stop()
+    results[stage] = {
+        "seconds": round(seconds, 4),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds, 1) if seconds else None,
+        "peak_mb": peak_mb,
+    }
+    memory = f", pico {peak_mb:.1f} MB" if peak_mb is not None else ""
+    print(f"⏱️ {stage}: {seconds:.3f}s, {rows} linhas{memory}")
+    return value
+
+
+def run_what_if(what_if, names, queries):
+    for i in range(queries):
+        what_if.set_recurring(names[i % len(names)], amount=100.0 + i % 50)
+        what_if.balance_at(what_if.end)
+
+
+def run_benchmark(transactions, cards, recurring, banks):
+    import pandas as pd
+    from extractors import FillcashExtractor
+    from formatter import FillcashFormatter
+    from generate_future_card_bills import generate_future_card_bills
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = Path(tmp)
+        config = synthetic_config(cards, recurring)
+        with open(workspace / "config.yml", "w", encoding="utf-8") as f:
+            yaml.safe_dump(config, f, allow_unicode=True, sort_keys=False)
+        for folder in ("c6", "bradesco", "itau"):
+            (workspace / "statements" / folder).mkdir(parents=True, exist_ok=True)
+
+        generators = {
+            "c6": (generate_c6_csv, "statements/c6/file.csv"),
+            "bradesco": (generate_bradesco_csv, "statements/bradesco/file.csv"),
+            "itau_csv": (generate_itau_csv, "statements/itau_file.csv"),
+            "itau_pdf": (generate_itau_pdf, "statements/itau/file.pdf"),
+            "itau_pdf_layout": (generate_itau_pdf, "statements/itau/file.pdf"),
+        }
+        extractor = FillcashExtractor(workspace / "config.yml")
+        frames = []
+        for bank in banks:
+            generator, path = generators[bank]
+            path = workspace / path
+            generator(path, transactions)
+            # itau_pdf_layout: mesmo PDF, lido pelas colunas do cabeçalho (itau_pdf_parser: layout)
+            layout = bank.endswith("_layout")
+            extractor.itau_pdf_parser = "layout" if layout else "text"
+            method = getattr(extractor, f"extract_{bank[:-len('_layout')] if layout else bank}")
+            df = measure(results, f"extract_{bank}", transactions, lambda: method(path))
+            frames.append(df.assign(account=bank.split("_")[0]))
+        extractor.write_output(pd.concat(frames, ignore_index=True))
+
+        generate_future_card_bills(workspace)
+        formatter = FillcashFormatter(workspace)
+        formatter.future_card_bills = formatter.load_future_card_bills()
+        measure(results, "build_cash_flow", transactions * len(banks), formatter.build_cash_flow)
+        names = [entry["name"] for entry in config["fixed_income"] + config["fixed_expenses"]]
+        if names:
+            what_if = formatter.what_if()
+            measure(results, "what_if", WHAT_IF_QUERIES, lambda: run_what_if(what_if, names, WHAT_IF_QUERIES))
+
+        df, config = formatter.load_data("silver_statements", formatter.config_path)
+        for writer in ("standard", "streaming"):
+            config["excel_writer"] = writer
+            output_path = workspace / "outputs" / f"bench_{writer}.xlsx"
+            measure(
+                results, f"generate_cashflow_excel_{writer}", len(df),
+                lambda: formatter.generate_cashflow_excel(df.copy(), config, output_path),
+            )
+    return results
+
+
+def import_times(command):
+    # python -X importtime escreve no stderr "self | acumulado | módulo" de cada import, em µs
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *command], capture_output=True, text=True,
+        cwd=Path(__file__).resolve().parent,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.rstrip()[1:]] = int(cumulative)
+    return modules
+
+
+def cli_import_time(runs=3):
+    # (total em ms, tempo por módulo de topo em µs, dependências pesadas carregadas) de
+    # run_pipeline.py --help; vale o menor total entre algumas execuções, para reduzir o ruído do
+    # sistema de arquivos
+    best = None
+    for _ in range(runs):
+        modules = import_times(["run_pipeline.py", "--help"])
+        top_level = {name: us for name, us in modules.items() if not name.startswith(" ")}
+        if best is None or sum(top_level.values()) < sum(best.values()):
+            best, loaded = top_level, modules
+    heavy = [name for name in HEAVY_MODULES if any(module.strip() == name for module in loaded)]
+    return sum(best.values()) / 1000, best, heavy
+
+
+def check_import_budget(budget_ms, runs=3):
+    print(f"=== ⏱️ Tempo de import de run_pipeline.py --help (orçamento: {budget_ms:.0f} ms) ===")
+    total_ms, top_level, heavy = cli_import_time(runs)
+    for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:5]:
+        print(f"   {name}: {us / 1000:.1f} ms")
+
+    problems = 0
+    if heavy:
+        problems += 1
+        print(f"🔴 Dependências pesadas importadas na inicialização: {', '.join(heavy)}")
+    flag = "🔴" if total_ms > budget_ms else "🟢"
+    problems += total_ms > budget_ms
+    print(f"{flag} Total: {total_ms:.1f} ms")
+    return problems
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current, baseline, threshold):
+    print(f"=== 📊 Comparação com baseline ({baseline['timestamp']}, {baseline.get('commit')}) ===")
+    regressions = 0
+    for stage, result in current["results"].items():
+        base = baseline["results"].get(stage)
+        if not base or not base["seconds"]:
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        flag = "🔴" if ratio > 1 + threshold else "🟢"
+        regressions += ratio > 1 + threshold
+        print(f"{flag} {stage}: {base['seconds']:.3f}s -> {result['seconds']:.3f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline com extratos sintéticos")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Transações por banco")
+    parser.add_argument("--cards", type=int, default=3)
+    parser.add_argument("--recurring", type=int, default=10)
+    parser.add_argument("--banks", nargs="+", choices=BANKS, default=list(BANKS))
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    parser.add_argument("--baseline", help="Índice da execução no histórico usada como baseline (ex.: 0, -2)")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Tolerância de regressão (padrão: 10%%)")
+    parser.add_argument("--no-memory", action="store_true", help="Não mede o pico de memória (tempos mais fiéis)")
+    parser.add_argument(
+        "--import-budget", type=float, metavar="MS",
+        help="Só verifica o tempo de import da CLI e falha se passar de MS milissegundos ou carregar pandas/openpyxl/pdfplumber",
+    )
+    args = parser.parse_args()
+
+    if args.import_budget is not None:
+        if check_import_budget(args.import_budget):
+            raise SystemExit("🔴 Inicialização da CLI acima do orçamento")
+        return
+
+    global TRACE_MEMORY
+    TRACE_MEMORY = not args.no_memory
+
+    history = load_history(args.history)
+    regressions = 0
+    for size in args.sizes:
+        print(f"=== ⏱️ Benchmark: {size} transações/banco, {args.cards} cartões, {args.recurring} recorrentes ===")
+        params = {
+            "transactions": size, "cards": args.cards, "recurring": args.recurring,
+            "banks": args.banks, "memory": TRACE_MEMORY,
+        }
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "params": params,
+            "results": run_benchmark(size, args.cards, args.recurring, args.banks),
+        }
+        if args.baseline is not None:
+            same_params = [run for run in history if run["params"] == params]
+            if same_params:
+                regressions += compare(entry, same_params[int(args.baseline)], args.threshold)
+            else:
+                print("⚠️ Nenhuma execução anterior com os mesmos parâmetros para comparar")
+        history.append(entry)
+
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.history, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    print(f"✅ Histórico salvo em: {args.history}")
+    if regressions:
+        raise SystemExit(f"🔴 {regressions} etapas mais lentas que a baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+from datetime import datetime
+from lazy_import import LazyModule
+from schedule import scatter_events
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+# Níveis de agregação do fluxo de caixa -> frequência do pandas (semanas de segunda a domingo)
+AGGREGATIONS = {"daily": "D", "weekly": "W", "monthly": "M"}
+
+
+def cash_flow_settings(config, today=None):
+    # (início, fim, agregação): do início do ano corrente até 31/12 do ano corrente + horizon_years
+    settings = config.get("cash_flow", {}) or {}
+    aggregation = settings.get("aggregation", "daily")
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"cash_flow.aggregation inválido: {aggregation} (use {', '.join(AGGREGATIONS)})")
+    today = today or datetime.today()
+    horizon_years = int(settings.get("horizon_years", 1))
+    return datetime(today.year, 1, 1), datetime(today.year + horizon_years, 12, 31), aggregation
+
+
+def projected_after_real(recurring, statement):
+    # Cada entrada/saída fixa é projetada só após o último dia real da própria conta;
+    # contas sem extrato usam o último dia do extrato inteiro
+    last_by_account = {}
+    if "account" in statement.columns:
+        last_by_account = statement.groupby("account")["date"].max().to_dict()
+    last_date = recurring["account"].map(last_by_account).fillna(statement["date"].max())
+    return recurring[recurring["date"].dt.date > last_date]
+
+
+def period_end(dates, aggregation):
+    # Data que representa o período de cada data: o próprio dia, o domingo da semana ou o fim do mês
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    if aggregation == "daily":
+        return dates.normalize()
+    return dates.to_period(AGGREGATIONS[aggregation]).end_time.normalize()
+
+
+class CashFlowModel:
+    # Fluxo de caixa esparso: guarda só os eventos datados (lançamentos reais somados por dia, faturas e
+    # entradas/saídas fixas). Saldos e tabelas por dia, semana ou mês são calculados sob demanda, então a
+    # memória acompanha o número de eventos, não dias × cartões
+    def __init__(self, events, columns, card_columns, start, end):
+        self.columns = list(columns)
+        self.card_columns = list(card_columns)
+        self.start = pd.Timestamp(start)
+        self.end = pd.Timestamp(end)
+
+        dates = pd.to_datetime(events["date"])
+        keep = ((dates >= self.start) & (dates <= self.end) & events["column"].isin(self.columns)).to_numpy()
+        # Ordenação estável: eventos do mesmo dia mantêm a ordem original (e as mesmas somas)
+        self.events = pd.DataFrame({
+            "date": dates.to_numpy()[keep],
+            "column": events["column"].to_numpy()[keep],
+            "amount": events["amount"].to_numpy(dtype=float)[keep],
+        }).sort_values("date", kind="stable", ignore_index=True)
+
+        # Saldo ao fim de cada dia com evento: entradas somam, saídas e faturas subtraem
+        effect = self.events["amount"].where(self.events["column"] == "inflow", -self.events["amount"])
+        net = effect.groupby(self.events["date"]).sum()
+        self.event_dates = pd.DatetimeIndex(net.index)
+        self.event_balance = net.cumsum().to_numpy()
+
+    def balance_at(self, dates):
+        # Saldo ao fim de cada data, por busca binária nos dias com evento
+        position = self.event_dates.searchsorted(pd.DatetimeIndex(pd.to_datetime(dates)), side="right") - 1
+        balance = np.where(position >= 0, self.event_balance[np.maximum(position, 0)], 0.0)
+        return balance.round(2)
+
+    def labels(self, aggregation="daily"):
+        if aggregation == "daily":
+            return pd.date_range(self.start, self.end)
+        return pd.period_range(self.start, self.end, freq=AGGREGATIONS[aggregation]).end_time.normalize()
+
+    def frame(self, aggregation="daily"):
+        # Tabela densa só no nível pedido (dias, semanas ou meses × colunas), com o saldo de fechamento
+        labels = self.labels(aggregation)
+        events = self.events.assign(date=period_end(self.events["date"], aggregation))
+        df = pd.DataFrame(scatter_events(labels, self.columns, events), columns=self.columns)
+        df.insert(0, "date", labels.date)
+        # Saldo de fechamento de cada linha (fim do dia, da semana ou do mês)
+        df["balance"] = self.balance_at(labels)
+        if aggregation != "daily":
+            df["min_balance"] = self.min_balance(labels, aggregation, df["balance"].to_numpy())
+        return df
+
+    def min_balance(self, labels, aggregation, closing):
+        # Menor saldo de cada período: o de abertura ou o do fim de algum dia com evento dentro dele
+        lowest = np.concatenate([[0.0], closing[:-1]])
+        period = labels.get_indexer(period_end(self.event_dates, aggregation))
+        lows = pd.Series(self.event_balance).groupby(period).min()
+        lowest[lows.index] = np.minimum(lowest[lows.index], lows.to_numpy())
+        return lowest.round(2)
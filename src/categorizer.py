@@ -0,0 +1,62 @@
+import re
+import unicodedata
+from collections import Counter
+from lazy_import import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+
+def normalize_description(description):
+    # "Fatura de  cartão" -> "FATURA DE CARTAO": maiúsculas, sem acentos e com espaços simples
+    text = unicodedata.normalize("NFKD", description).encode("ascii", "ignore").decode("ascii")
+    return " ".join(text.upper().split())
+
+
+class TransactionCategorizer:
+    def __init__(self, rules):
+        # rules: lista do config.yml com name, keywords (palavras/trechos literais) e patterns (regex)
+        self.names = []
+        alternatives = []
+        for rule in rules or []:
+            keywords = [
+                rf"(?<!\w){re.escape(normalize_description(keyword))}(?!\w)"
+                for keyword in rule.get("keywords", []) or []
+            ]
+            patterns = [f"(?:{pattern})" for pattern in rule.get("patterns", []) or []]
+            if not keywords and not patterns:
+                continue
+            # Cada regra é um lookahead a partir do início do texto: as alternativas são testadas na
+            # ordem do config.yml, então a primeira regra que casar vence, mesmo casando mais adiante
+            alternatives.append(f"(?=.*?(?P<rule{len(self.names)}>{'|'.join(keywords + patterns)}))")
+            self.names.append(rule["name"])
+
+        # Todas as regras numa única regex: uma busca por descrição, não uma por regra
+        self.regex = re.compile("^(?:" + "|".join(alternatives) + ")", re.IGNORECASE) if alternatives else None
+        self.memo = {}
+
+    def __bool__(self):
+        return self.regex is not None
+
+    def match(self, normalized):
+        match = self.regex.match(normalized)
+        if match is None:
+            return None
+        groups = match.groupdict()
+        return next(name for index, name in enumerate(self.names) if groups[f"rule{index}"] is not None)
+
+    def category(self, description):
+        key = normalize_description(description or "")
+        if key not in self.memo:
+            self.memo[key] = self.match(key)
+        return self.memo[key]
+
+    def categorize(self, descriptions):
+        # Extratos repetem muito as mesmas descrições: a regex roda só uma vez por descrição distinta
+        codes, uniques = pd.factorize(descriptions.fillna("").astype(str))
+        categories = np.array([self.category(text) for text in uniques], dtype=object)
+        return pd.Series(categories[codes], index=descriptions.index, name="category")
+
+    def summary(self, categories):
+        counts = Counter(category if isinstance(category, str) else "sem categoria" for category in categories)
+        return ", ".join(f"{name} {count}" for name, count in counts.most_common())
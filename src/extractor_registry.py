@@ -0,0 +1,93 @@
+import csv
+import importlib.util
+from importlib.metadata import entry_points
+from pathlib import Path
+import light_csv
+
+# Grupo de entry points de pacotes instalados que trazem extratores (cada um aponta para register)
+ENTRY_POINT_GROUP = "fillcash.extractors"
+C6_BANNER = "EXTRATO DE CONTA CORRENTE C6 BANK"
+
+
+def head_lines(head):
+    # Primeiros bytes do arquivo -> linhas de texto (a última pode estar cortada e é descartada)
+    text = head.decode("utf-8-sig", errors="replace")
+    lines = text.splitlines()
+    return lines[:-1] if len(lines) > 1 and not text.endswith("\n") else lines
+
+
+def has_header(head, is_header, sep):
+    return any(is_header(next(csv.reader([line], delimiter=sep), [])) for line in head_lines(head))
+
+
+def sniff_c6(head, path):
+    return C6_BANNER in head.decode("utf-8-sig", errors="replace") or has_header(head, light_csv.is_c6_header, ",")
+
+
+def sniff_bradesco(head, path):
+    return has_header(head, light_csv.is_bradesco_header, ";")
+
+
+def sniff_itau(head, path):
+    # PDF (só o Itaú tem parser de PDF) ou CSV com Data;Histórico;Valor
+    if head.startswith(b"%PDF"):
+        return True
+    return has_header(head, lambda fields: light_csv.is_itau_header(fields) and "Valor" in fields, ";")
+
+
+
+def group_entry_points(group):
+    # Python 3.10+: entry_points().select(group=...); 3.8 e 3.9 devolvem um dicionário por grupo
+    found = entry_points()
+    if hasattr(found, "select"):
+        return found.select(group=group)
+    return found.get(group, [])
+
+
+class ExtractorPlugin:
+    def __init__(self, bank, sniff, extract=None, priority=100):
+        self.bank = bank
+        self.sniff = sniff
+        # extract(input_path) -> DataFrame ou lista de dicts com date, description, amount, inflow e
+        # outflow. None: usa FillcashExtractor.extract_<bank> (extratores embutidos)
+        self.extract = extract
+        self.priority = priority
+
+
+class ExtractorRegistry:
+    def __init__(self):
+        self.plugins = {}
+        # Módulos carregados da pasta de plugins (entram nas entradas da etapa extract)
+        self.plugin_files = []
+        # Embutidos: o Bradesco vem antes do Itaú, cujo cabeçalho (Data, Histórico) é menos específico
+        self.register("c6", sniff_c6, priority=10)
+        self.register("bradesco", sniff_bradesco, priority=20)
+        self.register("itau", sniff_itau, priority=30)
+
+    def register(self, bank, sniff, extract=None, priority=100):
+        self.plugins[bank.lower()] = ExtractorPlugin(bank.lower(), sniff, extract, priority)
+
+    def discover(self, plugins_dir=None):
+        # Plugins de terceiros: módulos .py numa pasta e entry points de pacotes instalados, todos
+        # com uma função register(registry)
+        registers = []
+        if plugins_dir is not None and Path(plugins_dir).is_dir():
+            for path in sorted(Path(plugins_dir).glob("*.py")):
+                spec = importlib.util.spec_from_file_location(f"fillcash_plugin_{path.stem}", path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self.plugin_files.append(path)
+                registers.append(module.register)
+        registers.extend(entry_point.load() for entry_point in group_entry_points(ENTRY_POINT_GROUP))
+        for register in registers:
+            register(self)
+        return self
+
+    def detect(self, path, sniff_bytes=4096):
+        # Lê só o começo do arquivo, uma vez, e testa os plugins em ordem de prioridade
+        with open(path, "rb") as f:
+            head = f.read(sniff_bytes)
+        for plugin in sorted(self.plugins.values(), key=lambda plugin: plugin.priority):
+            if plugin.sniff(head, path):
+                return plugin.bank
+        return None
@@ -1,145 +1,654 @@
 
-import pandas as pd
-import csv
-import pdfplumber
-from datetime import datetime
+import calendar
+import io
+import multiprocessing
+import queue
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
+from datetime import date, datetime
+from itertools import islice
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import yaml
+from parse_cache import ParseCache
+from ledger import TransactionLedger
+from categorizer import TransactionCategorizer, normalize_description
+from extractor_registry import ExtractorRegistry
+from storage import ArtifactStore
+from instrumentation import file_size, paused, recorder, track
+from lazy_import import LazyModule
+import light_csv
+
+# pandas e pdfplumber só são importados nos caminhos que realmente os usam
+pd = LazyModule("pandas")
+
+# Incrementar sempre que a lógica de parsing mudar, invalidando o cache
+PARSER_VERSION = 3
+
+# Coluna extra usada por read_statement_block para detectar linhas com colunas a menos
+END_MARKER = "__fim__"
+
+# Páginas por tarefa do pool de processos na leitura de PDFs
+PDF_PAGES_PER_TASK = 16
+
+# Blocos já extraídos que cada arquivo pode deixar esperando enquanto os anteriores são gravados
+FILE_QUEUE_CHUNKS = 2
+
+# Modos de leitura do PDF do Itaú: texto corrido da página ou palavras posicionadas nas colunas
+ITAU_PDF_PARSERS = ("text", "layout")
+ITAU_DATE = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+ITAU_AMOUNT = re.compile(r"-?\d{1,3}(?:\.\d{3})*,\d{2}")
+# Início da palavra do cabeçalho (maiúsculas, sem acentos) -> coluna
+ITAU_HEADER_WORDS = {
+    "DATA": "date", "LANCAMENTO": "description", "HISTORICO": "description", "DESCRICAO": "description",
+    "VALOR": "amount", "SALDO": "balance",
+}
+
+
+def parse_itau_page_text(text):
+    transactions = []
+    for line in (text or "").split('\n'):
+        parts = line.strip().split()
+        if len(parts) < 3:
+            continue
+        try:
+            date = datetime.strptime(parts[0], "%d/%m/%Y").date()
+            amount_str = parts[-1]
+            amount = float(amount_str.replace('.', '').replace(',', '.'))
+            description = " ".join(parts[1:-1])
+            transactions.append({
+                "date": date,
+                "description": description.strip(),
+                "amount": amount
+            })
+        except Exception:
+            continue
+    return transactions
+
+
+def parse_dates(values):
+    return pd.to_datetime(values.str.strip(), format="%d/%m/%Y", errors="coerce")
+
+
+def parse_amounts(values, decimal=",", required=False):
+    # Converte valores no formato brasileiro (1.234,56) ou com ponto decimal (1234.56) de uma vez
+    values = values.str.strip()
+    if decimal == ",":
+        values = values.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    else:
+        values = values.str.replace(",", ".", regex=False)
+    empty = values == ""
+    amounts = pd.to_numeric(values, errors="coerce")
+    bad = amounts.isna() if required else amounts.isna() & ~empty
+    return amounts.fillna(0.0), bad
+
+
+class ItauPdfLayout:
+    # Colunas do extrato, detectadas pelas posições das palavras do cabeçalho. Data e lançamento são
+    # alinhados à esquerda (a palavra é localizada pelo x0); valor e saldo à direita (pelo x1)
+    def __init__(self, columns):
+        text_columns = sorted((x0, name) for name, (x0, _) in columns.items() if name in ("date", "description"))
+        number_columns = sorted((x1, name) for name, (_, x1) in columns.items() if name in ("amount", "balance"))
+        self.text_names = [name for _, name in text_columns]
+        self.text_bounds = [(left + right) / 2 for (left, _), (right, _) in zip(text_columns, text_columns[1:])]
+        self.number_names = [name for _, name in number_columns]
+        self.number_bounds = [(left + right) / 2 for (left, _), (right, _) in zip(number_columns, number_columns[1:])]
+        # Números que terminam antes deste ponto fazem parte do lançamento ("PARCELA 1,00")
+        first_number = min(columns[name][0] for name in self.number_names)
+        self.number_start = (columns["description"][0] + first_number) / 2
+
+    @classmethod
+    def from_header(cls, words):
+        columns = {}
+        current = None
+        for word in words:
+            key = normalize_description(word["text"])
+            name = next((name for prefix, name in ITAU_HEADER_WORDS.items() if key.startswith(prefix)), None)
+            if name is not None and name not in columns:
+                columns[name] = (word["x0"], word["x1"])
+                current = name
+            elif current is not None:
+                # Demais palavras do mesmo título ("Valor (R$)") estendem a coluna até o fim dele
+                columns[current] = (columns[current][0], word["x1"])
+        if not {"date", "description", "amount"} <= columns.keys():
+            return None
+        return cls(columns)
+
+    def column(self, word):
+        if word["x1"] > self.number_start and ITAU_AMOUNT.fullmatch(word["text"]):
+            return self.number_names[bisect_left(self.number_bounds, word["x1"])]
+        return self.text_names[bisect_right(self.text_bounds, word["x0"])]
+
+
+def group_lines(words, tolerance=3):
+    # Palavras -> linhas, pela posição vertical (top) e, em cada linha, da esquerda para a direita
+    lines = []
+    for word in sorted(words, key=lambda word: (word["top"], word["x0"])):
+        if lines and word["top"] - lines[-1][0]["top"] <= tolerance:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda word: word["x0"]) for line in lines]
+
+
+def parse_br_date(text):
+    match = ITAU_DATE.fullmatch(text)
+    if match is None:
+        return None
+    day, month, year = map(int, match.groups())
+    if year < 1 or not 1 <= month <= 12 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return None
+    return date(year, month, day)
+
+
+def parse_itau_page_words(words, layout=None):
+    # Uma passada por linha, sem exceções: a linha é cabeçalho (atualiza as colunas), lançamento
+    # (data válida e valor na coluna de valor) ou é ignorada. Retorna também o layout em uso,
+    # para as páginas seguintes sem cabeçalho
+    transactions = []
+    for line in group_lines(words):
+        header = ItauPdfLayout.from_header(line)
+        if header is not None:
+            layout = header
+            continue
+        if layout is None:
+            continue
+        cells = {"date": [], "description": [], "amount": [], "balance": []}
+        for word in line:
+            cells[layout.column(word)].append(word["text"])
+        transaction_date = parse_br_date(" ".join(cells["date"]))
+        amount = " ".join(cells["amount"])
+        if transaction_date is None or not ITAU_AMOUNT.fullmatch(amount):
+            continue
+        transactions.append({
+            "date": transaction_date,
+            "description": " ".join(cells["description"]),
+            "amount": float(amount.replace(".", "").replace(",", ".")),
+        })
+    return transactions, layout
+
+
+def find_itau_pdf_layout(input_path):
+    # Primeiro cabeçalho do PDF, para os processos que começam a ler no meio do arquivo
+    import pdfplumber
+
+    with pdfplumber.open(input_path) as pdf:
+        for page in pdf.pages:
+            _, layout = parse_itau_page_words(page.extract_words())
+            page.close()
+            if layout is not None:
+                return layout
+    return None
+
+
+def iter_itau_page_range(input_path, start, stop, parser="text", layout=None):
+    # Uma página por vez: o cache de layout (caracteres, linhas, objetos) de cada página é liberado
+    # logo depois do parsing, então a memória não cresce com o número de páginas
+    import pdfplumber
+
+    with pdfplumber.open(input_path) as pdf:
+        for number in range(start, stop):
+            page = pdf.pages[number]
+            transactions = None
+            if parser == "layout":
+                transactions, layout = parse_itau_page_words(page.extract_words(), layout)
+            if layout is None:
+                # Sem cabeçalho reconhecido (ou modo texto): divide o texto da página em espaços
+                transactions = parse_itau_page_text(page.extract_text())
+            page.close()
+            yield from transactions
+
+
+def pdf_pool_context():
+    # O pool de páginas pode ser criado dentro das threads de arquivos: fork num processo com várias
+    # threads pode travar, então os processos partem de um forkserver (ou spawn, onde não existe)
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def extract_itau_page_range(input_path, start, stop, parser="text", layout=None):
+    # Executado em cada processo do pool: lê apenas as páginas [start, stop)
+    return list(iter_itau_page_range(input_path, start, stop, parser, layout))
+
+
+def itau_pdf_frame(transactions):
+    # Bloco de transações do PDF -> DataFrame, com filtro e entradas/saídas vetorizados
+    df = pd.DataFrame(transactions, columns=["date", "description", "amount"])
+    df = df[~df["description"].str.contains("SALDO DO DIA", case=False, regex=False, na=False)]
+    amount = df["amount"]
+    return df.assign(
+        inflow=amount.where(amount > 0, 0.0), outflow=amount.where(amount < 0, 0.0).abs(),
+    ).reset_index(drop=True)
+
 
 class FillcashExtractor:
     def __init__(self, config_path: Path):
-        self.config_path = config_path
+        self.config_path = Path(config_path)
+        # Todos os caminhos (extratos, saídas, cache, ledger) são relativos à pasta do config.yml
+        self.workspace = self.config_path.parent
         with open(self.config_path, "r", encoding="utf-8") as f:
             config = yaml.safe_load(f)
-        self.bankname = config.get("bankname", "").lower()
-        self.statement_format = config.get("statement_format", "csv").lower()
-        self.input_path = Path(f"statements/{self.bankname}/file.{self.statement_format}")
-        self.output_path = Path("outputs/current_account_statement.csv")
+        # Extratores embutidos e plugins (pasta plugins/ do workspace e entry points fillcash.extractors)
+        self.registry = ExtractorRegistry().discover(self.workspace / config.get("plugins_dir", "plugins"))
+        self.sniff_bytes = int(float(config.get("sniff_kb", 4)) * 1024)
+        self.accounts = self.load_accounts(config)
+        self.store = ArtifactStore(config, self.workspace / "outputs")
+        self.workers = int(config.get("workers", 1) or 1)
+        self.file_workers = int(config.get("file_workers", 4) or 1)
+        self.light_csv_max_kb = config.get("light_csv_max_kb", 256) or 0
+        self.pdf_chunk_rows = int(config.get("pdf_chunk_rows", 5000) or 5000)
+        self.itau_pdf_parser = config.get("itau_pdf_parser", "text")
+        if self.itau_pdf_parser not in ITAU_PDF_PARSERS:
+            raise ValueError(f"itau_pdf_parser inválido: {self.itau_pdf_parser} (use {', '.join(ITAU_PDF_PARSERS)})")
+        cache_config = config.get("cache", {}) or {}
+        self.cache_enabled = cache_config.get("enabled", True)
+        self.cache = ParseCache(self.workspace / "outputs" / ".cache", cache_config.get("max_mb", 100))
+        ledger_config = config.get("ledger", {}) or {}
+        self.ledger = None
+        self.categorizer = TransactionCategorizer(config.get("categories", []))
+        if ledger_config.get("enabled", False):
+            self.ledger = TransactionLedger(self.workspace / ledger_config.get("path", "outputs/ledger.sqlite"))
 
-    def run(self):
-        method_name = f"extract_{self.bankname}"
-        method = getattr(self, method_name, None)
-        if method is None:
-            raise ValueError(f"Banco não suportado: {self.bankname}")
-        print(f"▶️ Extraindo transações do banco {self.bankname} ({self.statement_format.upper()})")
-        method()
-
-    def extract_itau(self):
-        if self.statement_format == "pdf":
-            self.extract_itau_pdf()
-        else:
-            self.extract_itau_csv()
-
-    def extract_itau_pdf(self):
-        transactions = []
-
-        with pdfplumber.open(self.input_path) as pdf:
-            for page in pdf.pages:
-                lines = page.extract_text().split('\n')
-                for line in lines:
-                    parts = line.strip().split()
-                    if len(parts) < 3:
-                        continue
-                    try:
-                        date = datetime.strptime(parts[0], "%d/%m/%Y").date()
-                        amount_str = parts[-1]
-                        amount = float(amount_str.replace('.', '').replace(',', '.'))
-                        description = " ".join(parts[1:-1])
-                        transactions.append({
-                            "date": date,
-                            "description": description.strip(),
-                            "amount": amount
-                        })
-                    except Exception:
-                        continue
-
-        df = pd.DataFrame(transactions)
-        df = df[~df["description"].str.contains("SALDO DO DIA", case=False, na=False)]
-        df["inflow"] = df["amount"].apply(lambda x: x if x > 0 else 0)
-        df["outflow"] = df["amount"].apply(lambda x: -x if x < 0 else 0)
-
-        self.save_output(df)
-
-    def extract_itau_csv(self):
-        df = pd.read_csv(self.input_path, sep=";", encoding="utf-8", dtype=str)
-        df = df.dropna(subset=["Data", "Histórico"])
-        transactions = []
-        for _, row in df.iterrows():
-            try:
-                date = pd.to_datetime(row["Data"], dayfirst=True).strftime("%Y-%m-%d")
-                description = row["Histórico"].strip()
-                amount = float(row["Valor"].replace('.', '').replace(',', '.'))
-                inflow = amount if amount > 0 else 0.0
-                outflow = -amount if amount < 0 else 0.0
-                transactions.append({
-                    "date": date,
-                    "description": description,
-                    "amount": amount,
-                    "inflow": inflow,
-                    "outflow": outflow
+    def load_accounts(self, config):
+        accounts = config.get("accounts")
+        if not accounts and not config.get("bankname"):
+            # Sem contas nem banco: cada arquivo em statements/<pasta>/ tem o banco detectado pelo conteúdo
+            accounts = [{"bank": "auto", "files": "statements/*/*"}]
+        if not accounts:
+            # Formato antigo: um único banco com statements/<banco>/file.<formato>
+            bankname = config.get("bankname", "").lower()
+            statement_format = config.get("statement_format", "csv").lower()
+            accounts = [{
+                "name": bankname,
+                "bank": bankname,
+                "format": statement_format,
+                "files": f"statements/{bankname}/file.{statement_format}",
+            }]
+
+        loaded = []
+        for account in accounts:
+            bank = account["bank"].lower()
+            if bank == "auto":
+                # Caixa de entrada com arquivos de vários bancos: banco e formato são definidos por arquivo
+                patterns = account.get("files", "statements/inbox/*")
+                loaded.append({
+                    "name": account.get("name"),
+                    "bank": bank,
+                    "format": "auto",
+                    "patterns": [patterns] if isinstance(patterns, str) else patterns,
                 })
-            except Exception:
                 continue
-        self.save_output(transactions)
-
-    def extract_bradesco(self):
-        transactions = []
-        with open(self.input_path, "r", encoding="utf-8") as f:
-            reader = csv.reader(f, delimiter=";")
-            header_found = False
-            for row in reader:
-                if not header_found and row[:6] == ["Data", "Histórico", "Docto.", "Crédito (R$)", "Débito (R$)", "Saldo (R$)"]:
-                    header_found = True
-                    continue
-                if not header_found or len(row) < 6 or not row[0].strip():
-                    continue
-                try:
-                    date = datetime.strptime(row[0].strip(), "%d/%m/%Y").strftime("%Y-%m-%d")
-                    description = row[1].strip()
-                    inflow = float(row[3].replace('.', '').replace(',', '.')) if row[3].strip() else 0.0
-                    outflow = float(row[4].replace('.', '').replace(',', '.')) if row[4].strip() else 0.0
-                    amount = float(row[5].replace('.', '').replace(',', '.')) if row[5].strip() else 0.0
-                    transactions.append({
-                        "date": date,
-                        "description": description,
-                        "amount": amount,
-                        "inflow": inflow,
-                        "outflow": outflow
-                    })
-                except Exception:
-                    continue
-        self.save_output(transactions)
-
-    def extract_c6(self):
-        transactions = []
-        with open(self.input_path, "r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            header_found = False
-            for row in reader:
-                if row and row[0].strip() == "Data Lançamento":
-                    header_found = True
+            statement_format = account.get("format", "csv").lower()
+            patterns = account.get("files", f"statements/{bank}/*.{statement_format}")
+            if isinstance(patterns, str):
+                patterns = [patterns]
+            loaded.append({
+                "name": account.get("name", bank),
+                "bank": bank,
+                "format": statement_format,
+                "patterns": patterns,
+            })
+        return loaded
+
+    def resolve_jobs(self):
+        jobs = []
+        for account in self.accounts:
+            if account["bank"] != "auto" and self.extract_method(account["bank"]) is None:
+                raise ValueError(f"Banco não suportado: {account['bank']}")
+            paths = sorted({
+                path for pattern in account["patterns"] for path in self.workspace.glob(pattern) if path.is_file()
+            })
+            if not paths:
+                print(f"⚠️ Nenhum arquivo encontrado para a conta {account['name'] or account['bank']}: {', '.join(account['patterns'])}")
+            for path in paths:
+                if account["bank"] != "auto":
+                    jobs.append((account, path))
                     continue
-                if not header_found or len(row) < 7:
+                # Só os primeiros KB de cada arquivo são lidos para decidir o banco
+                bank = self.registry.detect(path, self.sniff_bytes)
+                if bank is None:
+                    print(f"⚠️ Formato de extrato não reconhecido, arquivo ignorado: {path}")
                     continue
+                jobs.append(({
+                    "name": account["name"] or bank,
+                    "bank": bank,
+                    "format": path.suffix.lower().lstrip(".") or "csv",
+                    "patterns": account["patterns"],
+                    "detected": True,
+                }, path))
+        return jobs
+
+    def extract_method(self, bank):
+        # Extrator embutido (extract_<banco>) ou o extract de um plugin
+        method = getattr(self, f"extract_{bank}", None)
+        if method is None and bank in self.registry.plugins:
+            method = self.registry.plugins[bank].extract
+        return method
+
+    def run(self):
+        with track("extract") as metrics:
+            jobs = self.resolve_jobs()
+            if not jobs:
+                raise FileNotFoundError("Nenhum extrato encontrado para as contas configuradas")
+            detected = Counter(account["bank"] for account, _ in jobs if account.get("detected"))
+            if detected:
+                summary = ", ".join(f"{bank} {count}" for bank, count in sorted(detected.items()))
+                print(f"📥 {sum(detected.values())} arquivos classificados pelo conteúdo: {summary}")
+
+            if self.can_run_light(jobs):
+                rows = self.extract_light(jobs)
+                columns = light_csv.COLUMNS
+                if self.categorizer:
+                    rows = [row + (self.categorizer.category(row[1]),) for row in rows]
+                    columns = columns + ["category"]
+                    print(f"🏷️ Categorias: {self.categorizer.summary(row[-1] for row in rows)}")
+                output_path = self.store.write_rows(rows, columns, "current_account_statement")
+                print(f"✅ {len(rows)} transações salvas em: {output_path}")
+                metrics.update(
+                    light=True, rows_in=len(rows), rows_out=len(rows),
+                    bytes_read=sum(file_size(path) or 0 for _, path in jobs), bytes_written=file_size(output_path),
+                )
+                return
+
+            if self.ledger is None:
+                rows, output_path = self.extract_streaming(jobs)
+                metrics.update(
+                    rows_in=rows, rows_out=rows,
+                    bytes_read=sum(file_size(path) or 0 for _, path in jobs), bytes_written=file_size(output_path),
+                )
+                return
+
+            # Exportações sobrepostas são deduplicadas no ledger, arquivo a arquivo (o ordinal de
+            # lançamentos repetidos é contado no arquivo inteiro). Arquivos já gravados no ledger, com o
+            # mesmo conteúdo e extrator, nem são lidos; os demais são gravados à medida que chegam
+            pending = []
+            for account, input_path in jobs:
+                file_key = self.cache.key(input_path, f"{account['name']}:{self.extractor_name(account)}", PARSER_VERSION)
+                if self.ledger.has_file(file_key):
+                    print(f"📒 Extrato já registrado no ledger: {input_path}")
+                else:
+                    pending.append((account, input_path, file_key))
+            rows_in = 0
+            for chunks, (_, input_path, file_key) in zip(self.open_jobs([job[:2] for job in pending]), pending):
+                frame = pd.concat(list(chunks), ignore_index=True)
+                rows_in += len(frame)
+                self.ledger.upsert(frame, file_key=file_key, path=input_path)
+
+            # O extrato consolidado é o histórico completo do ledger, regravado a cada execução: a ordem
+            # (conta, data) e as categorias valem para todas as linhas, não só para as novas
+            df = self.ledger.load()
+            # A categoria é derivada da descrição (fora do cache e do ledger), então mudar as regras
+            # reclassifica todo o histórico
+            if self.categorizer:
+                df["category"] = self.categorizer.categorize(df["description"])
+                print(f"🏷️ Categorias: {self.categorizer.summary(df['category'])}")
+            output_path = self.write_output(df)
+            metrics.update(
+                rows_in=rows_in, rows_out=len(df),
+                bytes_read=sum(file_size(path) or 0 for _, path in jobs), bytes_written=file_size(output_path),
+            )
+
+    def open_jobs(self, jobs):
+        # Gera, para cada job e na ordem dos jobs, um iterador com os blocos do arquivo (consumir um
+        # antes de pedir o próximo). Arquivos independentes são extraídos em paralelo, cada um numa
+        # thread que entrega os blocos numa fila limitada: a memória fica em torno de file_workers ×
+        # FILE_QUEUE_CHUNKS blocos. Com --profile tudo roda na thread principal, para o cProfile
+        # enxergar a extração
+        file_workers = 1 if recorder.profile_dir is not None else min(self.file_workers, len(jobs))
+        if file_workers <= 1:
+            yield from (self.iter_file(*job) for job in jobs)
+            return
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=FILE_QUEUE_CHUNKS) for _ in jobs]
+        executor = ThreadPoolExecutor(max_workers=file_workers)
+        futures = []
+        try:
+            # As tarefas começam na ordem dos jobs, então o arquivo consumido agora sempre tem uma thread
+            for job, chunks in zip(jobs, queues):
+                futures.append(executor.submit(self.produce_chunks, job, chunks, stop))
+            for chunks in queues:
+                yield self.drain_chunks(chunks)
+        finally:
+            # Consumidor interrompido (erro na gravação): os arquivos ainda não iniciados são cancelados
+            # e as threads em andamento param no próximo bloco
+            stop.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def produce_chunks(self, job, chunks, stop):
+        def put(item):
+            while not stop.is_set():
                 try:
-                    date = datetime.strptime(row[0].strip(), "%d/%m/%Y").strftime("%Y-%m-%d")
-                    description = row[3].strip()
-                    inflow = float(row[4].replace(',', '.')) if row[4].strip() else 0.0
-                    outflow = float(row[5].replace(',', '.')) if row[5].strip() else 0.0
-                    amount = float(row[6].replace(',', '.')) if row[6].strip() else 0.0
-                    transactions.append({
-                        "date": date,
-                        "description": description,
-                        "amount": amount,
-                        "inflow": inflow,
-                        "outflow": outflow
-                    })
-                except Exception:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
                     continue
-        self.save_output(transactions)
+            return False
+
+        try:
+            for chunk in self.iter_file(*job):
+                if not put(chunk):
+                    return
+        except BaseException as error:
+            put(error)
+            return
+        put(StopIteration())
+
+    def drain_chunks(self, chunks):
+        while True:
+            item = chunks.get()
+            if isinstance(item, StopIteration):
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def extract_streaming(self, jobs):
+        # Sem ledger, os blocos de cada arquivo vão direto para o artefato, na ordem dos jobs:
+        # o extrato consolidado nunca fica inteiro em memória
+        counts = Counter()
+        with self.store.open_chunks("current_account_statement") as sink:
+            for chunks in self.open_jobs(jobs):
+                for chunk in chunks:
+                    if self.categorizer:
+                        chunk = chunk.assign(category=self.categorizer.categorize(chunk["description"]))
+                        counts.update(chunk["category"].fillna("sem categoria"))
+                    sink.write(chunk)
+        if self.categorizer:
+            print(f"🏷️ Categorias: {self.categorizer.summary(counts.elements())}")
+        print(f"✅ {sink.rows} transações salvas em: {sink.path}")
+        return sink.rows, sink.path
+
+    def can_run_light(self, jobs):
+        # Só CSVs pequenos de bancos com parser leve, sem ledger e com armazenamento em CSV
+        # (ledger, cache e parquet dependem do pandas)
+        if not self.light_csv_max_kb or self.ledger is not None or self.store.format != "csv":
+            return False
+        for account, path in jobs:
+            if account["bank"] not in light_csv.PARSERS or Path(path).suffix.lower() != ".csv":
+                return False
+        return sum(file_size(path) or 0 for _, path in jobs) <= self.light_csv_max_kb * 1024
+
+    def extract_light(self, jobs):
+        rows = []
+        for account, input_path in jobs:
+            with track(f"extract_{account['bank']}", account=account["name"], file=str(input_path)) as metrics:
+                print(f"▶️ Extraindo transações do banco {account['bank']} (CSV, sem pandas): {input_path}")
+                transactions = light_csv.PARSERS[account["bank"]](input_path)
+                metrics.update(light=True, bytes_read=file_size(input_path), rows_out=len(transactions))
+            rows.extend(transaction + (account["name"],) for transaction in transactions)
+        return rows
+
+    def extractor_name(self, account):
+        # Identifica o que gera as linhas de um arquivo: muda quando muda o extrator usado para lê-lo
+        name = f"extract_{account['bank']}:{account['format']}"
+        if account["format"] == "pdf" and self.itau_pdf_parser != "text":
+            name += f":{self.itau_pdf_parser}"
+        return name
+
+    def iter_file(self, account, input_path):
+        # Gera o arquivo em blocos de DataFrame (um único bloco nos formatos lidos de uma vez)
+        method_name = f"extract_{account['bank']}"
+        iter_method = getattr(self, f"iter_{account['bank']}", None)
+
+        # A métrica mede só a leitura: o tempo suspenso nos yields (gravação, fila cheia) vai para paused_seconds
+        with track(method_name, account=account["name"], file=str(input_path)) as metrics:
+            metrics["bytes_read"] = file_size(input_path)
+            cache_key = None
+            if self.cache_enabled:
+                cache_key = self.cache.key(input_path, self.extractor_name(account), PARSER_VERSION)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    print(f"♻️ Extrato inalterado, usando cache: {input_path}")
+                    metrics.update(cached=True, rows_out=len(cached))
+                    cached = cached.assign(account=account["name"])
+                    with paused(metrics):
+                        yield cached
+                    return
+
+            print(f"▶️ Extraindo transações do banco {account['bank']} ({account['format'].upper()}): {input_path}")
+            if iter_method is not None:
+                chunks = iter_method(input_path)
+            else:
+                chunks = [pd.DataFrame(self.extract_method(account["bank"])(input_path))]
+            if cache_key is not None:
+                chunks = self.cache.put_chunks(cache_key, chunks)
+            rows = 0
+            for chunk in chunks:
+                rows += len(chunk)
+                chunk = chunk.assign(account=account["name"])
+                with paused(metrics):
+                    yield chunk
+            metrics.update(cached=False, rows_out=rows)
+
+    def iter_itau(self, input_path):
+        if Path(input_path).suffix.lower() == ".pdf":
+            yield from self.iter_itau_pdf(input_path)
+        else:
+            yield self.extract_itau_csv(input_path)
+
+    def extract_itau(self, input_path):
+        if Path(input_path).suffix.lower() == ".pdf":
+            return self.extract_itau_pdf(input_path)
+        return self.extract_itau_csv(input_path)
+
+    def extract_itau_pdf(self, input_path):
+        return pd.concat(list(self.iter_itau_pdf(input_path)), ignore_index=True)
+
+    def iter_itau_pdf(self, input_path):
+        # Blocos de até pdf_chunk_rows linhas lidas, na ordem das páginas; sempre gera ao menos um bloco
+        import pdfplumber
+
+        with pdfplumber.open(input_path) as pdf:
+            page_count = len(pdf.pages)
+
+        if self.workers > 1 and page_count > 1:
+            transactions = self.iter_itau_pdf_parallel(input_path, page_count)
+        else:
+            transactions = iter_itau_page_range(input_path, 0, page_count, self.itau_pdf_parser)
+
+        chunk = list(islice(transactions, self.pdf_chunk_rows))
+        yield itau_pdf_frame(chunk)
+        while chunk := list(islice(transactions, self.pdf_chunk_rows)):
+            yield itau_pdf_frame(chunk)
+
+    def iter_itau_pdf_parallel(self, input_path, page_count):
+        workers = min(self.workers, page_count)
+        ranges = [
+            (start, min(start + PDF_PAGES_PER_TASK, page_count)) for start in range(0, page_count, PDF_PAGES_PER_TASK)
+        ]
+        print(f"⚙️ Processando {page_count} páginas em {workers} processos")
+        # Cada processo começa a ler no meio do arquivo: as colunas vêm do primeiro cabeçalho do PDF
+        layout = find_itau_pdf_layout(input_path) if self.itau_pdf_parser == "layout" else None
+
+        # No máximo duas tarefas por processo em andamento, consumidas na ordem das páginas:
+        # a memória depende de PDF_PAGES_PER_TASK, não do tamanho do PDF
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=pdf_pool_context()) as executor:
+            for start, stop in ranges:
+                pending.append(executor.submit(
+                    extract_itau_page_range, input_path, start, stop, self.itau_pdf_parser, layout,
+                ))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def extract_itau_csv(self, input_path):
+        df, malformed_rows = self.read_statement_block(
+            input_path, light_csv.is_itau_header, sep=";"
+        )
+        df = df[(df["Data"].str.strip() != "") & (df["Histórico"].str.strip() != "")]
+        dates = parse_dates(df["Data"])
+        amount, bad_amount = parse_amounts(df["Valor"], decimal=",", required=True)
+        return self.build_transactions(
+            input_path, dates, df["Histórico"], amount,
+            amount.where(amount > 0, 0.0), amount.where(amount < 0, 0.0).abs(),
+            bad_amount, malformed_rows,
+        )
+
+    def extract_bradesco(self, input_path):
+        df, malformed_rows = self.read_statement_block(input_path, light_csv.is_bradesco_header, sep=";")
+        df = df[df["Data"].str.strip() != ""]
+        dates = parse_dates(df["Data"])
+        inflow, bad_inflow = parse_amounts(df["Crédito (R$)"], decimal=",")
+        outflow, bad_outflow = parse_amounts(df["Débito (R$)"], decimal=",")
+        amount, bad_amount = parse_amounts(df["Saldo (R$)"], decimal=",")
+        return self.build_transactions(
+            input_path, dates, df["Histórico"], amount, inflow, outflow,
+            bad_inflow | bad_outflow | bad_amount, malformed_rows,
+        )
+
+    def extract_c6(self, input_path):
+        df, malformed_rows = self.read_statement_block(
+            input_path, light_csv.is_c6_header, sep=","
+        )
+        df = df[df.iloc[:, 0].str.strip() != ""]
+        dates = parse_dates(df.iloc[:, 0])
+        inflow, bad_inflow = parse_amounts(df.iloc[:, 4], decimal=".")
+        outflow, bad_outflow = parse_amounts(df.iloc[:, 5], decimal=".")
+        amount, bad_amount = parse_amounts(df.iloc[:, 6], decimal=".")
+        return self.build_transactions(
+            input_path, dates, df.iloc[:, 3], amount, inflow, outflow,
+            bad_inflow | bad_outflow | bad_amount, malformed_rows,
+        )
+
+    def read_statement_block(self, input_path, is_header, sep):
+        text = Path(input_path).read_text(encoding="utf-8-sig")
+
+        # Localiza o cabeçalho uma única vez; o restante é lido em bloco pelo read_csv
+        header, offset = light_csv.find_header(text, is_header, sep)
+        if header is None:
+            raise ValueError(f"Cabeçalho não encontrado em: {input_path}")
+
+        lines = [line for line in text[offset:].splitlines() if line.strip()]
+        # Marcador no fim de cada linha: linhas com colunas a mais são descartadas pelo parser e,
+        # nas com colunas a menos, o marcador não chega à última coluna (que vem preenchida com "")
+        body = "\n".join(f"{line}{sep}{END_MARKER}" for line in lines)
+        df = pd.read_csv(
+            io.StringIO(body), sep=sep, header=None, names=header + [END_MARKER], dtype=str,
+            keep_default_na=False, skip_blank_lines=True, on_bad_lines="skip",
+        )
+        df = df[df[END_MARKER] == END_MARKER].drop(columns=END_MARKER)
+        return df, len(lines) - len(df)
+
+    def build_transactions(self, input_path, dates, descriptions, amount, inflow, outflow, bad_amounts, malformed_rows):
+        valid = dates.notna() & ~bad_amounts
+        bad_rows = int((~valid).sum()) + malformed_rows
+        if bad_rows:
+            print(f"⚠️ {bad_rows} linhas inválidas ignoradas em: {input_path}")
+        return pd.DataFrame({
+            "date": dates[valid].dt.strftime("%Y-%m-%d"),
+            "description": descriptions[valid].str.strip(),
+            "amount": amount[valid],
+            "inflow": inflow[valid],
+            "outflow": outflow[valid],
+        }).reset_index(drop=True)
 
-    def save_output(self, transactions):
-        df = pd.DataFrame(transactions)
-        self.output_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(self.output_path, sep="|", index=False)
-        print(f"✅ {len(df)} transações salvas em: {self.output_path}")
+    def write_output(self, df):
+        output_path = self.store.write(df, "current_account_statement")
+        print(f"✅ {len(df)} transações salvas em: {output_path}")
+        return output_path
@@ -1,132 +1,335 @@
 
-import pandas as pd
 import yaml
 from datetime import datetime
 from pathlib import Path
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment
-from openpyxl.formatting.rule import ColorScaleRule
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.utils import get_column_letter
+from lazy_import import LazyModule
+from schedule import expand_recurring
+from cash_flow import CashFlowModel, cash_flow_settings, period_end, projected_after_real
+from storage import ArtifactStore
+from reconciliation import CardBillReconciler
+from scenarios import ScenarioEngine, risk_before_income
+from what_if import WhatIf
+from instrumentation import file_size, track
+
+pd = LazyModule("pandas")
+
+
+def card_column_names(bills):
+    # Mesmo nome das colunas dos cartões na planilha: "Itau - Mastercard (1234)"
+    return (
+        bills["bank"].str.capitalize() + " - " + bills["name"].str.capitalize()
+        + " (" + bills["last_digits"].astype(str) + ")"
+    )
+
 
 class FillcashFormatter:
-    def __init__(self):
-        self.base_path = Path(__file__).resolve().parent
+    def __init__(self, workspace: Path = Path(".")):
+        # Pasta com config.yml, statements/ e outputs/
+        self.workspace = Path(workspace)
+        self.config_path = self.workspace / "config.yml"
 
     def run(self):
         print("▶️ Executando build e format...")
         self.future_card_bills = self.load_future_card_bills()
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+        if (config.get("reconciliation", {}) or {}).get("enabled", False):
+            CardBillReconciler(config, self.workspace).run(self.future_card_bills)
         self.build_cash_flow()
         self.format_sheet()
 
     def load_future_card_bills(self):
-        path = self.base_path.parent / "statements" / "future_card_bills.xlsx"
+        path = self.workspace / "statements" / "future_card_bills.xlsx"
+        typed_path = self.workspace / "outputs" / "future_card_bills.parquet"
+
+        # A planilha pode ser editada à mão; só é relida quando for mais nova que a cópia tipada
+        if typed_path.exists() and typed_path.stat().st_mtime >= path.stat().st_mtime:
+            return pd.read_parquet(typed_path, memory_map=True)
+
         df = pd.read_excel(path)
         df["due_date"] = pd.to_datetime(df["due_date"]).dt.date
         df["last_digits"] = df["last_digits"].astype(str)  # ✅ correção aqui
+        typed_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(typed_path, index=False)
         return df
 
 
     def build_cash_flow(self):
-        statement_path = "outputs/current_account_statement.csv"
-        config_path = "config.yml"
-        output_path = "outputs/silver_statements.csv"
-
-        today = datetime.today()
-        start_date = datetime(today.year, 1, 1)
-        end_date = datetime(today.year + 1, 12, 31)
-        date_range = pd.date_range(start=start_date, end=end_date)
-
-        df1 = pd.read_csv(statement_path, sep="|")
-        df1["date"] = pd.to_datetime(df1["date"]).dt.date
-
-        with open(config_path, "r") as f:
+        with track("build_cash_flow") as metrics:
+            with open(self.config_path, "r") as f:
+                config = yaml.safe_load(f)
+
+            store = ArtifactStore(config, self.workspace / "outputs")
+            df1 = store.read("current_account_statement")
+            model, bill_events, recurring = self.cash_flow_model(config, store, df1)
+            _, _, aggregation = cash_flow_settings(config)
+            df_final = model.frame(aggregation)
+            metrics.update(events=len(model.events), aggregation=aggregation)
+
+            scenarios = ScenarioEngine(config)
+            if scenarios.enabled:
+                # Faturas e entradas/saídas fixas projetadas variam entre os cenários; o sinal é o efeito
+                # no saldo. Lançamentos até o último dia real são iguais em todos
+                projected = pd.concat([
+                    bill_events[bill_events["column"].isin(model.card_columns)].assign(
+                        kind="bill", amount=-bill_events["amount"],
+                    ),
+                    recurring.assign(
+                        kind=recurring["column"].map({"inflow": "income", "outflow": "expense"}),
+                        amount=recurring["amount"].where(recurring["column"] == "inflow", -recurring["amount"]),
+                    )[["date", "column", "amount", "kind"]],
+                ], ignore_index=True)
+                projected = projected[pd.to_datetime(projected["date"]).between(model.start, model.end)]
+                labels = pd.to_datetime(df_final["date"])
+                scenarios.add_columns(df_final, labels, projected, df1["date"].max(), config)
+
+            output_path = store.write(df_final, "silver_statements")
+            metrics.update(rows_in=len(df1), rows_out=len(df_final), bytes_written=file_size(output_path))
+            print(f"✅ Silver statement saved to: {output_path}")
+
+    def what_if(self):
+        # API "e se" sobre o mesmo modelo do build, sem regravar nada:
+        #   FillcashFormatter(workspace).what_if().set_recurring("aluguel", amount=2500).first_negative()
+        with open(self.config_path, "r") as f:
             config = yaml.safe_load(f)
-
+        self.future_card_bills = self.load_future_card_bills()
+        store = ArtifactStore(config, self.workspace / "outputs")
+        statement = store.read("current_account_statement")
+        model, _, _ = self.cash_flow_model(config, store, statement)
+        return WhatIf(model, config, statement)
+
+    def cash_flow_model(self, config, store, statement):
+        # Eventos datados: lançamentos reais somados por dia, faturas dos cartões e entradas/saídas
+        # fixas. Retorna também as faturas e as fixas projetadas, usadas pelos cenários
+        start_date, end_date, _ = cash_flow_settings(config)
         cards = config.get("cards", [])
-        fixed_income = config.get("fixed_income", [])
-        fixed_expenses = config.get("fixed_expenses", [])
-
-        df = pd.DataFrame({"date": date_range})
-        df["inflow"] = 0.0
-        df["outflow"] = 0.0
-
-        for card in cards:
-            col = f"{card['bank'].capitalize()} - {card['name'].capitalize()} ({card['last_digits']})"
-            df[col] = 0.0
-
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-
-        # Aplicar faturas futuras de cartões diretamente nas colunas dos cartões
-        for _, bill in self.future_card_bills.iterrows():
-            col = f"{bill['bank'].capitalize()} - {bill['name'].capitalize()} ({bill['last_digits']})"
-            if col in df.columns:
-                df.loc[df['date'] == bill['due_date'], col] += bill['amount']
-
-        extrato_por_dia = df1.groupby("date")[["inflow", "outflow"]].sum().reset_index()
-        extrato_por_dia["date"] = pd.to_datetime(extrato_por_dia["date"]).dt.date
-
-        dias_com_extrato = set(df1["date"].unique())
-        last_real_date = df1["date"].max()
-
-        for income in fixed_income:
-            df.loc[
-                (df["date"].apply(lambda d: d.day == income["day"] and d > last_real_date and d not in dias_com_extrato)),
-                "inflow"
-            ] += income["amount"]
-
-        for expense in fixed_expenses:
-            df.loc[
-                (df["date"].apply(lambda d: d.day == expense["day"] and d > last_real_date and d not in dias_com_extrato)),
-                "outflow"
-            ] += expense["amount"]
-
-        df_merge = df.merge(extrato_por_dia, on="date", how="left", suffixes=("", "_real"))
-        df_merge["inflow"] = df_merge["inflow_real"].combine_first(df_merge["inflow"])
-        df_merge["outflow"] = df_merge["outflow_real"].combine_first(df_merge["outflow"])
-        df_merge = df_merge.drop(columns=["inflow_real", "outflow_real"])
-
-        ordered_columns = ["date", "inflow", "outflow"] + [
-            col for col in df_merge.columns if col not in ["date", "inflow", "outflow"]
+        card_columns = [
+            f"{card['bank'].capitalize()} - {card['name'].capitalize()} ({card['last_digits']})"
+            for card in cards
         ]
-        df_final = df_merge[ordered_columns]
-        Path(output_path).parent.mkdir(exist_ok=True)
-        df_final.to_csv(output_path, sep="|", index=False)
-        print(f"✅ Silver statement saved to: {output_path}")
-
-    def format_sheet(self):
+        columns = ["inflow", "outflow"] + card_columns
+
+        # Lançamentos reais, somados por dia
+        extrato_por_dia = statement.groupby("date")[["inflow", "outflow"]].sum().reset_index()
+        real_events = extrato_por_dia.melt(id_vars="date", var_name="column", value_name="amount")
+
+        bill_events = self.bill_events(store, config)
+
+        # Entradas e saídas fixas expandidas para todos os meses do horizonte de uma vez
+        rollover = config.get("day_rollover", "roll_forward")
+        recurring = pd.concat([
+            expand_recurring(config.get("fixed_income", []), "inflow", start_date, end_date, rollover),
+            expand_recurring(config.get("fixed_expenses", []), "outflow", start_date, end_date, rollover),
+        ], ignore_index=True)
+
+        recurring = projected_after_real(recurring, statement)
+
+        events = pd.concat([real_events, bill_events, recurring[["date", "column", "amount"]]], ignore_index=True)
+        return CashFlowModel(events, columns, card_columns, start_date, end_date), bill_events, recurring
+
+    def bill_events(self, store, config):
+        # Faturas diretamente nas colunas dos cartões
+        bills = self.future_card_bills
+        reconciliation = config.get("reconciliation", {}) or {}
+        if not reconciliation.get("enabled", False):
+            return pd.DataFrame({
+                "date": bills["due_date"],
+                "column": card_column_names(bills),
+                "amount": bills["amount"],
+            })
+
+        # Com a conciliação, faturas pagas usam os débitos reais: o valor sai da coluna outflow
+        # e vai para a coluna do cartão no dia do pagamento; as pendentes seguem com a projeção
+        report = store.read(
+            "card_bill_reconciliation", date_columns=("due_date", "paid_date"), text_columns=("last_digits",),
+        )
+        paid = report[report["status"] == "conciliada"]
+        pending = report[report["status"] == "pendente"]
+        return pd.concat([
+            pd.DataFrame({"date": pending["due_date"], "column": card_column_names(pending), "amount": pending["projected_amount"]}),
+            pd.DataFrame({"date": paid["paid_date"], "column": card_column_names(paid), "amount": paid["paid_amount"]}),
+            pd.DataFrame({"date": paid["paid_date"], "column": "outflow", "amount": -paid["paid_amount"]}),
+        ], ignore_index=True)
+
+    def running_balance(self, df, card_columns):
+        # Saldo acumulado: entradas - saídas - faturas dos cartões no vencimento
+        daily = df["inflow"] - df["outflow"] - df[card_columns].sum(axis=1)
+        return daily.cumsum().round(2)
+
+    def sheet_output_path(self):
         today_str = datetime.today().strftime("%d%m%y")
-        output_file = f"outputs/format_sheet_{today_str}.xlsx"
-
-        df, config = self.load_data("outputs/silver_statements.csv", "config.yml")
-        Path("outputs").mkdir(parents=True, exist_ok=True)
-
-        self.generate_cashflow_excel(df, config, output_file)
-        print(f"✅ Cashflow file saved to: {output_file}")
+        return self.workspace / "outputs" / f"format_sheet_{today_str}.xlsx"
 
-    def load_data(self, csv_path: str, config_path: str):
-        df = pd.read_csv(csv_path, sep="|")
+    def format_sheet(self):
+        with track("format_sheet") as metrics:
+            output_file = self.sheet_output_path()
+
+            df, config = self.load_data("silver_statements", self.config_path)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            last_real_date = None
+            if any(col.startswith("scenario_") for col in df.columns):
+                # O risco dos cenários conta a partir do último dia real do extrato
+                store = ArtifactStore(config, self.workspace / "outputs")
+                last_real_date = store.read("current_account_statement")["date"].max()
+
+            self.generate_cashflow_excel(df, config, output_file, last_real_date)
+            metrics.update(rows_in=len(df), rows_out=len(df), bytes_written=file_size(output_file))
+            print(f"✅ Cashflow file saved to: {output_file}")
+
+    def load_data(self, artifact_name: str, config_path: Path):
         with open(config_path, "r") as f:
             config = yaml.safe_load(f)
+        df = ArtifactStore(config, self.workspace / "outputs").read(artifact_name)
+        # Na planilha a data continua como texto ISO, como no CSV
+        df["date"] = df["date"].astype(str)
         return df, config
 
-    def generate_cashflow_excel(self, df, config, output_path):
-        df["balance"] = 0
+    def generate_cashflow_excel(self, df, config, output_path, last_real_date=None):
+        from openpyxl import Workbook
+        from openpyxl.utils.dataframe import dataframe_to_rows
+
+        # Colunas dos cenários vão para uma aba própria, fora da planilha de fluxo de caixa
+        scenario_columns = [col for col in df.columns if col.startswith("scenario_")]
+        scenarios = df[["date"] + scenario_columns] if scenario_columns else None
+        df = df.drop(columns=scenario_columns)
+
+        if config.get("excel_writer", "standard") == "streaming":
+            self.generate_cashflow_excel_streaming(df, config, output_path, scenarios, last_real_date)
+            return
+
+        write_formulas = self.prepare_balance(df, config)
         wb = Workbook()
         ws = wb.active
         ws.title = "Cashflow"
-        for row in dataframe_to_rows(df, index=False, header=True):
-            ws.append(row)
+        with track("excel.append_rows", rows_in=len(df)):
+            for row in dataframe_to_rows(df, index=False, header=True):
+                ws.append(row)
 
         header = [cell.value for cell in ws[1]]
         col_idx = {col: idx + 1 for idx, col in enumerate(header)}
-        self.apply_card_styles(ws, col_idx, config["cards"])
-        self.insert_balance_formulas(ws, col_idx, config["cards"])
-        self.apply_conditional_formatting(ws, col_idx)
-        self.center_all_cells(ws)
-        wb.save(output_path)
+        with track("excel.card_styles", rows_in=len(df)):
+            self.apply_card_styles(ws, col_idx, config["cards"])
+        with track("excel.balance_formulas", rows_in=len(df)):
+            self.insert_balance_formulas(ws, col_idx, config, write_formulas)
+        with track("excel.conditional_formatting"):
+            self.apply_conditional_formatting(ws, col_idx)
+        with track("excel.center_cells", rows_in=len(df)):
+            self.center_all_cells(ws)
+        if scenarios is not None:
+            self.write_scenario_sheet(wb, scenarios, config, last_real_date)
+        with track("excel.save") as metrics:
+            wb.save(output_path)
+            metrics["bytes_written"] = file_size(output_path)
+
+    def generate_cashflow_excel_streaming(self, df, config, output_path, scenarios=None, last_real_date=None):
+        from openpyxl import Workbook
+        from openpyxl.utils import get_column_letter
+
+        # Cada linha é montada uma única vez (valores, estilos e fórmula) e gravada direto no arquivo
+        write_formulas = self.prepare_balance(df, config)
+        header = list(df.columns)
+        col_idx = {col: idx + 1 for idx, col in enumerate(header)}
+        balance_pos = col_idx["balance"] - 1
+        date_pos = col_idx["date"] - 1
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Cashflow")
+        card_styles = self.register_named_styles(wb, col_idx, config["cards"])
+        deduction_index = self.build_deduction_index(col_idx, config)
+
+        balance_letter = get_column_letter(col_idx["balance"])
+        ws.conditional_formatting.add(f"{balance_letter}2:{balance_letter}{len(df) + 1}", self.balance_color_scale())
+
+        header_styles = ["fillcash_center"] * len(header)
+        header_styles[balance_pos] = "fillcash_bold"
+        for pos, styles in card_styles.items():
+            header_styles[pos] = styles[0]
+        ws.append([self.styled_cell(ws, value, style) for value, style in zip(header, header_styles)])
+
+        with track("excel.stream_rows", rows_in=len(df)):
+            for row, values in enumerate(df.itertuples(index=False, name=None), start=2):
+                values = list(values)
+                if write_formulas:
+                    values[balance_pos] = self.balance_formula(row, values[date_pos], col_idx, deduction_index)
+                row_styles = ["fillcash_center"] * len(header)
+                row_styles[balance_pos] = "fillcash_bold"
+                for pos, styles in card_styles.items():
+                    row_styles[pos] = styles[1] if row % 2 == 0 else styles[2]
+                ws.append([self.styled_cell(ws, value, style) for value, style in zip(values, row_styles)])
+
+        if scenarios is not None:
+            self.write_scenario_sheet(wb, scenarios, config, last_real_date)
+        with track("excel.save") as metrics:
+            wb.save(output_path)
+            metrics["bytes_written"] = file_size(output_path)
+
+    def write_scenario_sheet(self, wb, scenarios, config, last_real_date=None):
+        # Aba "Cenarios": resumo do risco antes da próxima entrada fixa e, por dia simulado, as faixas
+        # de saldo e a chance de o saldo já ter ficado negativo. Funciona também em modo write-only
+        with track("excel.scenarios", rows_in=len(scenarios)):
+            ws = wb.create_sheet("Cenarios")
+            income_date = None
+            if last_real_date is not None:
+                income_date, probability = risk_before_income(
+                    scenarios["date"], scenarios["scenario_first_negative"], last_real_date, config
+                )
+            if income_date is not None:
+                ws.append([
+                    "Chance de saldo negativo antes da próxima entrada fixa",
+                    income_date.strftime("%Y-%m-%d"), round(probability, 4),
+                ])
+                ws.append([])
+
+            columns = [col for col in scenarios.columns if col != "scenario_simulated"]
+            # Sem str.removeprefix (Python 3.9+): "date" fica igual, "scenario_p5" vira "p5"
+            ws.append([col[len("scenario_"):] if col.startswith("scenario_") else col for col in columns])
+            simulated = scenarios[scenarios["scenario_simulated"].astype(bool)]
+            for values in simulated[columns].itertuples(index=False, name=None):
+                ws.append(list(values))
+
+    def prepare_balance(self, df, config):
+        # balance_mode: formula (fórmulas encadeadas) ou value (saldo já calculado pelo pipeline)
+        balance_mode = config.get("balance_mode", "formula")
+        if balance_mode == "value":
+            if "balance" not in df.columns:
+                card_columns = [col for col in df.columns if col not in ("date", "inflow", "outflow")]
+                df["balance"] = self.running_balance(df, card_columns)
+            return False
+        df["balance"] = 0
+        return True
+
+    def register_named_styles(self, wb, col_idx, cards):
+        from openpyxl.styles import PatternFill, Font, Alignment, NamedStyle
+
+        center = Alignment(horizontal="center", vertical="center")
+        wb.add_named_style(NamedStyle(name="fillcash_center", alignment=center))
+        wb.add_named_style(NamedStyle(name="fillcash_bold", font=Font(bold=True), alignment=center))
+
+        card_styles = {}
+        for card in cards:
+            name = f"{card['bank'].capitalize()} - {card['name'].capitalize()} ({card['last_digits']})"
+            if name not in col_idx:
+                continue
+            styles = []
+            for suffix, color in zip(("header", "even", "odd"), card["color"]):
+                style_name = f"fillcash_card_{col_idx[name]}_{suffix}"
+                fill = PatternFill(start_color=color[1:], end_color=color[1:], fill_type="solid")
+                wb.add_named_style(NamedStyle(name=style_name, fill=fill, alignment=center))
+                styles.append(style_name)
+            card_styles[col_idx[name] - 1] = styles
+        return card_styles
+
+    def styled_cell(self, ws, value, style):
+        from openpyxl.cell import WriteOnlyCell
+
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
 
     def apply_card_styles(self, ws, col_idx, cards):
+        from openpyxl.styles import PatternFill
+        from openpyxl.utils import get_column_letter
+
         for card in cards:
             name = f"{card['bank'].capitalize()} - {card['name'].capitalize()} ({card['last_digits']})"
             colors = card["color"]
@@ -137,48 +340,80 @@ class FillcashFormatter:
                     fill_color = colors[1] if row % 2 == 0 else colors[2]
                     ws[f"{col_letter}{row}"].fill = PatternFill(start_color=fill_color[1:], end_color=fill_color[1:], fill_type="solid")
 
-    def insert_balance_formulas(self, ws, col_idx, cards):
+    def insert_balance_formulas(self, ws, col_idx, config, write_formulas=True):
+        from openpyxl.styles import Font, Alignment
+        from openpyxl.utils import get_column_letter
+
         balance_letter = get_column_letter(col_idx["balance"])
-        inflow_letter = get_column_letter(col_idx["inflow"])
-        outflow_letter = get_column_letter(col_idx["outflow"])
         date_letter = get_column_letter(col_idx["date"])
+        deduction_index = self.build_deduction_index(col_idx, config)
 
         for row in range(2, ws.max_row + 1):
-            current_date = ws[f"{date_letter}{row}"].value
-            if isinstance(current_date, str):
-                current_date = datetime.strptime(current_date, "%Y-%m-%d").date()
-            future_charges = self.future_card_bills[self.future_card_bills['due_date'] == current_date]
-
-            deductions = []
-            for _, bill in future_charges.iterrows():
-                for col in col_idx:
-                    if bill['bank'].capitalize() in col and bill['last_digits'] in col:
-                        card_letter = get_column_letter(col_idx[col])
-                        deductions.append(f"{card_letter}{row}")
-
-            inflow_cell = f"{inflow_letter}{row}"
-            outflow_cell = f"{outflow_letter}{row}"
-            prev_balance = f"{balance_letter}{row - 1}" if row > 2 else "0"
-            deduction_expr = "-(" + "+".join(deductions) + ")" if deductions else ""
-            formula = f"={prev_balance}+{inflow_cell}-{outflow_cell}{deduction_expr}"
-
             cell = ws[f"{balance_letter}{row}"]
-            cell.value = formula
+            if write_formulas:
+                cell.value = self.balance_formula(row, ws[f"{date_letter}{row}"].value, col_idx, deduction_index)
             cell.font = Font(bold=True)
             cell.alignment = Alignment(horizontal="center", vertical="center")
 
+    def build_deduction_index(self, col_idx, config):
+        from openpyxl.utils import get_column_letter
+
+        # Dia da fatura -> letras das colunas dos cartões lançadas naquele dia, montado uma única vez
+        # (vencimento da projeção ou, com a conciliação, dia do pagamento real)
+        events = self.bill_events(ArtifactStore(config, self.workspace / "outputs"), config)
+        events = events[events["column"] != "outflow"]
+        _, _, aggregation = cash_flow_settings(config)
+        if aggregation != "daily":
+            # Linhas por semana/mês: cada fatura é descontada na linha do período em que cai
+            events = events.assign(date=period_end(events["date"], aggregation).date)
+        index = {}
+        for due_date, col in zip(events["date"], events["column"]):
+            if col not in col_idx:
+                continue
+            letters = index.setdefault(due_date, [])
+            card_letter = get_column_letter(col_idx[col])
+            if card_letter not in letters:
+                letters.append(card_letter)
+        return index
+
+    def balance_formula(self, row, current_date, col_idx, deduction_index):
+        from openpyxl.utils import get_column_letter
+
+        balance_letter = get_column_letter(col_idx["balance"])
+        inflow_letter = get_column_letter(col_idx["inflow"])
+        outflow_letter = get_column_letter(col_idx["outflow"])
+
+        if isinstance(current_date, str):
+            current_date = datetime.strptime(current_date, "%Y-%m-%d").date()
+        deductions = [f"{card_letter}{row}" for card_letter in deduction_index.get(current_date, [])]
+
+        inflow_cell = f"{inflow_letter}{row}"
+        outflow_cell = f"{outflow_letter}{row}"
+        prev_balance = f"{balance_letter}{row - 1}" if row > 2 else "0"
+        deduction_expr = "-(" + "+".join(deductions) + ")" if deductions else ""
+        return f"={prev_balance}+{inflow_cell}-{outflow_cell}{deduction_expr}"
+
     def apply_conditional_formatting(self, ws, col_idx):
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
         balance_letter = get_column_letter(col_idx["balance"])
         balance_range = f"{balance_letter}2:{balance_letter}{ws.max_row}"
-        rule = ColorScaleRule(
+        ws.conditional_formatting.add(balance_range, self.balance_color_scale())
+        ws[f"{balance_letter}1"].font = Font(bold=True)
+
+    def balance_color_scale(self):
+        from openpyxl.formatting.rule import ColorScaleRule
+
+        return ColorScaleRule(
             start_type='num', start_value=-5000, start_color='FF0000',
             mid_type='num', mid_value=0, mid_color='FFFF00',
             end_type='num', end_value=20000, end_color='00FF00'
         )
-        ws.conditional_formatting.add(balance_range, rule)
-        ws[f"{balance_letter}1"].font = Font(bold=True)
 
     def center_all_cells(self, ws):
+        from openpyxl.styles import Alignment
+
         for row in ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
             for cell in row:
                 cell.alignment = Alignment(horizontal="center", vertical="center")
@@ -1,37 +1,112 @@
 
+import warnings
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import yaml
 from pathlib import Path
+from reconciliation import CardBillReconciler
+from storage import ArtifactStore
 
-def generate_future_card_bills():
-    config_path = Path("config.yml")
+FORECAST_METHODS = ("zero", "mean", "median", "seasonal")
+
+
+def paid_bill_history(workspace, config, cards):
+    # Matriz cartões × meses com o total pago de fatura, a partir do extrato já extraído
+    store = ArtifactStore(config, Path(workspace) / "outputs")
+    if not store.path("current_account_statement").exists():
+        return pd.DataFrame(index=range(len(cards)), dtype=float)
+    payments = CardBillReconciler(config, workspace).find_payments(store.read("current_account_statement"))
+
+    # Pagamento -> cartão: pelo final do cartão ou, quando o banco só tem um cartão, pelo banco
+    by_digits = {str(card["last_digits"]): index for index, card in enumerate(cards)}
+    banks = pd.Series([card["bank"].lower() for card in cards])
+    single_card_banks = {bank: index for index, bank in banks.items() if (banks == bank).sum() == 1}
+    card = payments["last_digits"].map(by_digits).fillna(payments["bank"].map(single_card_banks))
+
+    history = payments.assign(card=card, month=payments["paid_date"].dt.to_period("M")).dropna(subset=["card"])
+    monthly = history.groupby(["card", "month"])["paid_amount"].sum().unstack("month")
+    if monthly.empty:
+        return pd.DataFrame(index=range(len(cards)), dtype=float)
+    months = pd.period_range(monthly.columns.min(), monthly.columns.max(), freq="M")
+    return monthly.reindex(index=range(len(cards)), columns=months)
+
+
+def forecast_amounts(history, months, method="median", window=6, fallback=None):
+    # Valores (cartões × meses do horizonte) calculados de uma vez para todos os cartões
+    fallback = np.zeros(len(history)) if fallback is None else np.asarray(fallback, dtype=float)
+    if method == "zero":
+        return np.zeros((len(history), len(months)))
+
+    # Média/mediana dos últimos `window` meses do histórico, ignorando meses sem pagamento identificado
+    recent = history.to_numpy(dtype=float)[:, -window:] if history.shape[1] else np.empty((len(history), 0))
+    with warnings.catch_warnings():
+        # Cartões sem nenhum pagamento no histórico resultam em nan e usam o fallback
+        warnings.simplefilter("ignore", RuntimeWarning)
+        trailing = np.nanmean(recent, axis=1) if method == "mean" else np.nanmedian(recent, axis=1)
+    trailing = np.where(np.isnan(trailing), fallback, trailing)
+    amounts = np.repeat(trailing[:, None], len(months), axis=1)
+
+    if method == "seasonal" and history.shape[1]:
+        # Mesmo mês do ano anterior, quando existe; senão a estimativa pelos meses recentes
+        last_year = history.columns.get_indexer(pd.PeriodIndex(months, freq="M") - 12)
+        seasonal = np.full(amounts.shape, np.nan)
+        found = last_year >= 0
+        seasonal[:, found] = history.to_numpy(dtype=float)[:, last_year[found]]
+        amounts = np.where(np.isnan(seasonal), amounts, seasonal)
+    return amounts.round(2)
+
+
+def generate_future_card_bills(workspace: Path = Path(".")):
+    config_path = Path(workspace) / "config.yml"
 
     with open(config_path, "r", encoding="utf-8") as f:
         config = yaml.safe_load(f)
 
     cards = config.get("cards", [])
+    forecast = config.get("bill_forecast", {}) or {}
+    method = forecast.get("method", "zero")
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"bill_forecast.method inválido: {method} (use {', '.join(FORECAST_METHODS)})")
+    horizon = int(forecast.get("horizon", 12))
+
     today = datetime.today()
-    future_months = pd.date_range(start=today, periods=12, freq="MS").to_pydatetime()
-
-    rows = []
-    for card in cards:
-        for month in future_months:
-            rows.append({
-                "bank": card["bank"],
-                "name": card["name"],
-                "last_digits": card["last_digits"],
-                "due_day": card["due_day"],
-                "month": month.strftime("%Y-%m"),
-                "due_date": datetime(month.year, month.month, card["due_day"]),
-                "amount": 0.0
-            })
-
-    df = pd.DataFrame(rows)
-    output_path = Path("statements/future_card_bills.xlsx")
+    future_months = pd.date_range(start=today, periods=horizon, freq="MS")
+    history = paid_bill_history(workspace, config, cards) if method != "zero" else pd.DataFrame(index=range(len(cards)))
+    amounts = forecast_amounts(
+        history, future_months, method, int(forecast.get("window", 6)),
+        fallback=[float(card.get("amount", 0.0)) for card in cards],
+    )
+
+    # Uma linha por cartão × mês, montada com repeat/tile em vez de laços
+    card_index = np.repeat(np.arange(len(cards)), len(future_months))
+    months = np.tile(future_months.to_numpy(), len(cards))
+    due_days = np.array([card["due_day"] for card in cards], dtype=int)[card_index]
+    month_starts = pd.DatetimeIndex(months).normalize()
+    # Vencimento no dia due_day do mês (dias inexistentes, como 31 em abril, caem no último dia)
+    due_dates = month_starts + pd.to_timedelta(np.minimum(due_days, month_starts.days_in_month) - 1, unit="D")
+    df = pd.DataFrame({
+        "bank": [cards[i]["bank"] for i in card_index],
+        "name": [cards[i]["name"] for i in card_index],
+        "last_digits": [cards[i]["last_digits"] for i in card_index],
+        "due_day": due_days,
+        "month": month_starts.strftime("%Y-%m"),
+        "due_date": due_dates,
+        "amount": amounts.reshape(-1) if len(cards) else [],
+    })
+
+    output_path = Path(workspace) / "statements" / "future_card_bills.xlsx"
     output_path.parent.mkdir(parents=True, exist_ok=True)
     df.to_excel(output_path, index=False)
     print(f"✅ future_card_bills.xlsx salvo em: {output_path}")
 
+    # Cópia tipada gravada depois da planilha (mais nova), para o formatter não reler o xlsx
+    typed = df.assign(due_date=df["due_date"].dt.date, last_digits=df["last_digits"].astype(str))
+    typed_path = Path(workspace) / "outputs" / "future_card_bills.parquet"
+    typed_path.parent.mkdir(parents=True, exist_ok=True)
+    typed.to_parquet(typed_path, index=False)
+    if method != "zero":
+        print(f"📈 Faturas estimadas por {method} dos pagamentos de {history.shape[1]} meses ({horizon} meses à frente)")
+
 if __name__ == "__main__":
     generate_future_card_bills()
@@ -0,0 +1,130 @@
+import cProfile
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em KB no Linux
+    return round(peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024, 2)
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+class MetricsRecorder:
+    def __init__(self):
+        self.metrics_path = None
+        self.profile_dir = None
+        self.run_id = None
+        self.lock = threading.Lock()
+        self.profiling = False
+
+    def configure(self, metrics_path=None, profile_dir=None):
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.run_id = uuid.uuid4().hex[:12]
+
+    @contextmanager
+    def track(self, stage, **fields):
+        # Mede uma etapa; quem chama pode preencher rows_in, rows_out, bytes_read e bytes_written no dicionário
+        if self.metrics_path is None and self.profile_dir is None:
+            yield dict(fields)
+            return
+
+        record = {"rows_in": None, "rows_out": None, "bytes_read": None, "bytes_written": None, **fields}
+        # Tempo e crescimento de RSS dos trechos em paused(record), descontados da etapa
+        record["_paused"] = {"used": False, "wall": 0.0, "cpu": 0.0, "rss": 0.0}
+        # Só a etapa mais externa é perfilada: o cProfile não aceita perfis aninhados ou simultâneos
+        profiler = None
+        with self.lock:
+            if self.profile_dir is not None and not self.profiling:
+                self.profiling = True
+                profiler = cProfile.Profile()
+
+        started_at = datetime.now().isoformat(timespec="milliseconds")
+        wall_start = time.perf_counter()
+        in_worker = threading.current_thread() is not threading.main_thread()
+        cpu_start = time.thread_time() if in_worker else time.process_time()
+        # ru_maxrss é o pico do processo inteiro e só cresce: a etapa é medida pelo quanto o elevou
+        rss_start = peak_rss_mb()
+        status = "ok"
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.profiling = False
+            cpu_end = time.thread_time() if in_worker else time.process_time()
+            rss_end = peak_rss_mb()
+            paused = record.pop("_paused")
+            record.update({
+                "run_id": self.run_id,
+                "stage": stage,
+                "started_at": started_at,
+                "status": status,
+                "wall_seconds": round(time.perf_counter() - wall_start - paused["wall"], 4),
+                "cpu_seconds": round(cpu_end - cpu_start - paused["cpu"], 4),
+                "peak_rss_mb": rss_end,
+                "peak_rss_growth_mb": round(max(rss_end - rss_start - paused["rss"], 0.0), 2),
+            })
+            if paused["used"]:
+                record["paused_seconds"] = round(paused["wall"], 4)
+            self.write(record)
+            if profiler is not None:
+                self.dump_profile(profiler, stage)
+
+    @contextmanager
+    def paused(self, record):
+        # Trecho que não pertence à etapa medida em record. Ex.: um gerador medido por track fica suspenso
+        # no yield enquanto quem consome grava o bloco ou espera vaga na fila
+        paused = record.get("_paused")
+        if paused is None:
+            yield
+            return
+        wall_start = time.perf_counter()
+        in_worker = threading.current_thread() is not threading.main_thread()
+        cpu_start = time.thread_time() if in_worker else time.process_time()
+        rss_start = peak_rss_mb()
+        try:
+            yield
+        finally:
+            cpu_end = time.thread_time() if in_worker else time.process_time()
+            paused["used"] = True
+            paused["wall"] += time.perf_counter() - wall_start
+            paused["cpu"] += cpu_end - cpu_start
+            paused["rss"] += peak_rss_mb() - rss_start
+
+    def write(self, record):
+        if self.metrics_path is None:
+            return
+        with self.lock:
+            self.metrics_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.metrics_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+
+    def dump_profile(self, profiler, stage):
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.profile_dir / f"{self.run_id}_{stage}.pstats")
+
+
+recorder = MetricsRecorder()
+track = recorder.track
+paused = recorder.paused
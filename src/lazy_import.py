@@ -0,0 +1,19 @@
+import importlib
+
+
+class LazyModule:
+    # Só importa o módulo no primeiro acesso a um atributo (ex.: pd.DataFrame), para que
+    # comandos rápidos (--help, etapas puladas, CSVs pequenos) não paguem o import do pandas
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            # import_module já é thread-safe (lock por módulo do próprio import system)
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "carregado" if self._module is not None else "não carregado"
+        return f"<LazyModule {self._name} ({state})>"
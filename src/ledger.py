@@ -0,0 +1,100 @@
+import hashlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from lazy_import import LazyModule
+
+pd = LazyModule("pandas")
+
+FINGERPRINT_COLUMNS = ["account", "date", "description", "inflow", "outflow", "amount"]
+LEDGER_COLUMNS = ["date", "description", "amount", "inflow", "outflow", "account"]
+
+
+class TransactionLedger:
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS transactions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fingerprint TEXT NOT NULL,
+                    account TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    description TEXT,
+                    amount REAL,
+                    inflow REAL,
+                    outflow REAL,
+                    ordinal INTEGER NOT NULL,
+                    ingested_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_fingerprint ON transactions (fingerprint)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions (account, date)")
+            # Exportações já gravadas (hash do conteúdo + conta + extrator): não são lidas de novo
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingested_files (
+                    file_key TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    rows INTEGER NOT NULL,
+                    inserted INTEGER NOT NULL,
+                    ingested_at TEXT NOT NULL
+                )
+            """)
+
+    def connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def fingerprint(self, df):
+        df = df.copy()
+        df["date"] = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+        # O ordinal diferencia lançamentos idênticos no mesmo dia (ex.: duas compras iguais)
+        df["ordinal"] = df.groupby(FINGERPRINT_COLUMNS, sort=False).cumcount()
+        keys = df["account"].astype(str)
+        for col in FINGERPRINT_COLUMNS[1:]:
+            values = df[col].round(2) if col in ("inflow", "outflow", "amount") else df[col]
+            keys = keys + "|" + values.astype(str)
+        keys = keys + "|" + df["ordinal"].astype(str)
+        df["fingerprint"] = [hashlib.sha1(key.encode("utf-8")).hexdigest() for key in keys]
+        return df
+
+    def has_file(self, file_key):
+        with self.connect() as conn:
+            return conn.execute("SELECT 1 FROM ingested_files WHERE file_key = ?", (file_key,)).fetchone() is not None
+
+    def upsert(self, df, file_key=None, path=None):
+        with self.connect() as conn:
+            # Todas as linhas são verificadas: o índice único descarta as já registradas, inclusive
+            # exportações carregadas fora de ordem (ex.: fevereiro depois de janeiro e março)
+            candidates = self.fingerprint(df)
+
+            ingested_at = datetime.now().isoformat(timespec="seconds")
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO transactions
+                    (fingerprint, account, date, description, amount, inflow, outflow, ordinal, ingested_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    (row.fingerprint, row.account, row.date, row.description,
+                     row.amount, row.inflow, row.outflow, int(row.ordinal), ingested_at)
+                    for row in candidates.itertuples(index=False)
+                ),
+            )
+            inserted = conn.total_changes - before
+            if file_key is not None:
+                # Na mesma transação das linhas: a exportação só conta como lida se elas foram gravadas
+                conn.execute(
+                    "INSERT OR REPLACE INTO ingested_files (file_key, path, rows, inserted, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                    (file_key, str(path), len(df), inserted, ingested_at),
+                )
+        print(f"📒 {inserted} novas transações no ledger ({len(df)} lidas)")
+        return inserted
+
+    def load(self):
+        with self.connect() as conn:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(LEDGER_COLUMNS)} FROM transactions ORDER BY account, date, id",
+                conn,
+            )
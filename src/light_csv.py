@@ -0,0 +1,129 @@
+import csv
+import io
+import re
+from datetime import datetime
+from pathlib import Path
+
+# Caminho sem pandas para extratos CSV pequenos: para poucas centenas de linhas o import do
+# pandas custa mais que o parsing. As regras são as mesmas de FillcashExtractor.extract_*
+COLUMNS = ["date", "description", "amount", "inflow", "outflow", "account"]
+BRADESCO_HEADER = ["Data", "Histórico", "Docto.", "Crédito (R$)", "Débito (R$)", "Saldo (R$)"]
+
+# Mesmo critério do pd.to_numeric: só números simples (sem "nan", "inf" ou "1_000")
+NUMBER = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+
+
+def is_itau_header(fields):
+    return "Data" in fields and "Histórico" in fields
+
+
+def is_bradesco_header(fields):
+    return fields[:6] == BRADESCO_HEADER
+
+
+def is_c6_header(fields):
+    return bool(fields) and fields[0].strip() == "Data Lançamento"
+
+
+def find_header(text, is_header, sep):
+    # Retorna (cabeçalho, posição onde começam as linhas de dados)
+    offset = 0
+    while offset < len(text):
+        end = text.find("\n", offset)
+        end = len(text) if end == -1 else end
+        fields = next(csv.reader([text[offset:end].rstrip("\r")], delimiter=sep), [])
+        offset = end + 1
+        if is_header(fields):
+            return fields, offset
+    return None, offset
+
+
+def read_rows(input_path, is_header, sep):
+    text = Path(input_path).read_text(encoding="utf-8-sig")
+    header, offset = find_header(text, is_header, sep)
+    if header is None:
+        raise ValueError(f"Cabeçalho não encontrado em: {input_path}")
+
+    body = text[offset:]
+    expected_rows = sum(1 for line in body.splitlines() if line.strip())
+    # Linhas com colunas a mais ou a menos são descartadas, como no read_csv
+    rows = [row for row in csv.reader(io.StringIO(body), delimiter=sep) if len(row) == len(header)]
+    return header, rows, expected_rows - len(rows)
+
+
+def parse_date(text):
+    try:
+        return datetime.strptime(text.strip(), "%d/%m/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def parse_amount(text, decimal=",", required=False):
+    # Retorna (valor, inválido), com as mesmas regras de extractors.parse_amounts
+    text = text.strip()
+    if decimal == ",":
+        text = text.replace(".", "").replace(",", ".")
+    else:
+        text = text.replace(",", ".")
+    if NUMBER.fullmatch(text):
+        return float(text), False
+    return 0.0, required or text != ""
+
+
+def report(input_path, bad_rows):
+    if bad_rows:
+        print(f"⚠️ {bad_rows} linhas inválidas ignoradas em: {input_path}")
+
+
+def extract_itau(input_path):
+    header, rows, bad_rows = read_rows(input_path, is_itau_header, ";")
+    date_pos, description_pos, amount_pos = header.index("Data"), header.index("Histórico"), header.index("Valor")
+    transactions = []
+    for row in rows:
+        if row[date_pos].strip() == "" or row[description_pos].strip() == "":
+            continue
+        date = parse_date(row[date_pos])
+        amount, bad_amount = parse_amount(row[amount_pos], ",", required=True)
+        if date is None or bad_amount:
+            bad_rows += 1
+            continue
+        inflow = amount if amount > 0 else 0.0
+        outflow = -amount if amount < 0 else 0.0
+        transactions.append((date, row[description_pos].strip(), amount, inflow, outflow))
+    report(input_path, bad_rows)
+    return transactions
+
+
+def extract_bradesco(input_path):
+    _, rows, bad_rows = read_rows(input_path, is_bradesco_header, ";")
+    return extract_columns(input_path, rows, bad_rows, date=0, description=1, inflow=3, outflow=4, amount=5, decimal=",")
+
+
+def extract_c6(input_path):
+    _, rows, bad_rows = read_rows(input_path, is_c6_header, ",")
+    return extract_columns(input_path, rows, bad_rows, date=0, description=3, inflow=4, outflow=5, amount=6, decimal=".")
+
+
+def extract_columns(input_path, rows, bad_rows, date, description, inflow, outflow, amount, decimal):
+    transactions = []
+    for row in rows:
+        if row[date].strip() == "":
+            continue
+        parsed_date = parse_date(row[date])
+        inflow_value, bad_inflow = parse_amount(row[inflow], decimal)
+        outflow_value, bad_outflow = parse_amount(row[outflow], decimal)
+        amount_value, bad_amount = parse_amount(row[amount], decimal)
+        if parsed_date is None or bad_inflow or bad_outflow or bad_amount:
+            bad_rows += 1
+            continue
+        transactions.append((parsed_date, row[description].strip(), amount_value, inflow_value, outflow_value))
+    report(input_path, bad_rows)
+    return transactions
+
+
+# Bancos com caminho leve (apenas arquivos .csv)
+PARSERS = {
+    "itau": extract_itau,
+    "bradesco": extract_bradesco,
+    "c6": extract_c6,
+}
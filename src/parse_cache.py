@@ -0,0 +1,64 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from lazy_import import LazyModule
+from storage import ParquetChunkWriter
+
+pd = LazyModule("pandas")
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, cache_dir: Path, max_mb=100):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+
+    def key(self, input_path, extractor_name, parser_version):
+        content_hash = file_sha256(input_path)
+        raw = f"{content_hash}:{extractor_name}:{parser_version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def entry_path(self, key):
+        return self.cache_dir / f"{key}.parquet"
+
+    def get(self, key):
+        path = self.entry_path(key)
+        if not path.exists():
+            return None
+        # Atualiza o mtime para servir de referência LRU na limpeza
+        os.utime(path)
+        return pd.read_parquet(path)
+
+    def put_chunks(self, key, chunks):
+        # Repassa os blocos adiante gravando-os na entrada do cache; a entrada só passa a existir
+        # se todos os blocos forem consumidos
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        writer = ParquetChunkWriter(self.entry_path(key))
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+                yield chunk
+        except BaseException:
+            writer.discard()
+            raise
+        writer.close()
+        with self.lock:
+            self.evict()
+
+    def evict(self):
+        entries = sorted(self.cache_dir.glob("*.parquet"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in entries)
+        # Remove as entradas menos recentemente usadas até caber no limite
+        while entries and total > self.max_bytes:
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
@@ -0,0 +1,80 @@
+import hashlib
+import json
+from pathlib import Path
+from parse_cache import file_sha256
+
+
+def select_config(config, key):
+    # "cards[].color" -> [card["color"] for card in cards]; "fixed_income" -> config["fixed_income"]
+    if "[]." in key:
+        list_key, field = key.split("[].", 1)
+        return [item.get(field) for item in config.get(list_key) or []]
+    return config.get(key)
+
+
+class Stage:
+    def __init__(self, name, run, inputs=(), config_keys=(), outputs=(), params=None):
+        self.name = name
+        self.run = run
+        self.inputs = inputs
+        self.config_keys = list(config_keys)
+        self.outputs = outputs
+        self.params = params or {}
+
+    def input_paths(self):
+        return [Path(p) for p in (self.inputs() if callable(self.inputs) else self.inputs)]
+
+    def output_paths(self):
+        return [Path(p) for p in (self.outputs() if callable(self.outputs) else self.outputs)]
+
+
+class PipelineRunner:
+    def __init__(self, stages, config, state_path: Path = Path("outputs/.pipeline_state.json")):
+        self.stages = stages
+        self.config = config
+        self.state_path = Path(state_path)
+
+    def stage_names(self):
+        return [stage.name for stage in self.stages]
+
+    def load_state(self):
+        if not self.state_path.exists():
+            return {}
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_state(self, state):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+
+    def fingerprint(self, stage):
+        files = {}
+        for path in stage.input_paths():
+            files[str(path)] = file_sha256(path) if path.exists() else None
+        payload = {
+            "files": files,
+            "config": {key: select_config(self.config, key) for key in stage.config_keys},
+            "params": stage.params,
+        }
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def run(self, force=False, from_stage=None):
+        if from_stage is not None and from_stage not in self.stage_names():
+            raise ValueError(f"Etapa desconhecida: {from_stage} (use {', '.join(self.stage_names())})")
+
+        state = self.load_state()
+        forced = force
+        for stage in self.stages:
+            forced = forced or stage.name == from_stage
+            # As entradas de cada etapa incluem as saídas da anterior, então mudanças se propagam
+            fingerprint = self.fingerprint(stage)
+            outputs_exist = all(path.exists() for path in stage.output_paths())
+            if not forced and outputs_exist and state.get(stage.name) == fingerprint:
+                print(f"⏭️ Etapa {stage.name} sem alterações, pulando")
+                continue
+
+            stage.run()
+            state[stage.name] = fingerprint
+            self.save_state(state)
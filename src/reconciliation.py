@@ -0,0 +1,149 @@
+import re
+from pathlib import Path
+from categorizer import TransactionCategorizer, normalize_description
+from storage import ArtifactStore
+from instrumentation import file_size, track
+from lazy_import import LazyModule
+
+pd = LazyModule("pandas")
+
+REPORT_COLUMNS = [
+    "bank", "name", "last_digits", "due_date", "projected_amount", "paid_date", "paid_amount",
+    "difference", "status", "description", "account",
+]
+
+
+class CardBillReconciler:
+    def __init__(self, config, workspace: Path = Path(".")):
+        settings = config.get("reconciliation", {}) or {}
+        self.store = ArtifactStore(config, Path(workspace) / "outputs")
+        self.category = settings.get("category", "pagamento_fatura")
+        self.matcher = TransactionCategorizer([{
+            "name": self.category,
+            "keywords": settings.get("keywords", ["PGTO FAT CARTAO", "PAGAMENTO FATURA", "FATURA DE CARTAO"]),
+        }])
+        self.window_days = settings.get("window_days", 7)
+        self.amount_tolerance = settings.get("amount_tolerance", 0.1)
+        self.cards = config.get("cards", [])
+        # Conta -> banco, usado quando a descrição do pagamento não cita o cartão. Contas detectadas
+        # pelo conteúdo (bank: auto) recebem o nome do próprio banco
+        accounts = config.get("accounts") or [{"bank": config.get("bankname", "")}]
+        self.account_banks = {str(card["bank"]).lower(): str(card["bank"]).lower() for card in self.cards}
+        self.account_banks.update({
+            account.get("name", account["bank"]).lower(): account["bank"].lower()
+            for account in accounts if account["bank"].lower() != "auto"
+        })
+
+    def run(self, bills):
+        with track("reconcile") as metrics:
+            statement = self.store.read("current_account_statement")
+            report = self.reconcile(statement, bills)
+            output_path = self.store.write(report, "card_bill_reconciliation", date_columns=("due_date", "paid_date"))
+            counts = report["status"].value_counts()
+            print(
+                f"🧾 Conciliação: {counts.get('conciliada', 0)} pagamentos conciliados, "
+                f"{counts.get('pendente', 0)} faturas pendentes, "
+                f"{counts.get('pagamento_sem_fatura', 0)} pagamentos sem fatura: {output_path}"
+            )
+            metrics.update(rows_in=len(statement), rows_out=len(report), bytes_written=file_size(output_path))
+
+    def find_payments(self, statement):
+        if "category" in statement.columns:
+            is_payment = statement["category"] == self.category
+        else:
+            is_payment = self.matcher.categorize(statement["description"]).notna()
+        payments = statement[is_payment & (statement["outflow"] > 0)]
+        payments = pd.DataFrame({
+            "paid_date": pd.to_datetime(payments["date"]),
+            "paid_amount": payments["outflow"],
+            "description": payments["description"],
+            "account": payments["account"] if "account" in payments.columns else "",
+        }).reset_index(drop=True)
+
+        # Cartão citado na descrição: final do cartão e/ou banco ("PGTO FAT CARTAO C6", "FATURA 1234")
+        normalized = payments["description"].map(normalize_description)
+        digits = sorted({str(card["last_digits"]) for card in self.cards})
+        banks = sorted({normalize_description(card["bank"]) for card in self.cards})
+        payments["last_digits"] = None
+        payments["bank"] = None
+        if digits:
+            pattern = "(?<!\\d)(" + "|".join(map(re.escape, digits)) + ")(?!\\d)"
+            payments["last_digits"] = normalized.str.extract(pattern, expand=False)
+        if banks:
+            pattern = "(?<!\\w)(" + "|".join(map(re.escape, banks)) + ")(?!\\w)"
+            payments["bank"] = normalized.str.extract(pattern, expand=False).str.lower()
+        by_digits = {str(card["last_digits"]): card["bank"].lower() for card in self.cards}
+        payments["bank"] = (
+            payments["bank"]
+            .fillna(payments["last_digits"].map(by_digits))
+            .fillna(payments["account"].str.lower().map(self.account_banks))
+        )
+        # Colunas só com NA viram float no pandas 2 e não fazem merge com as chaves de texto das faturas
+        payments[["bank", "last_digits"]] = payments[["bank", "last_digits"]].astype(object)
+        return payments
+
+    def match_bills(self, payments, bills, keys):
+        # Candidatas: faturas com as mesmas chaves e vencimento a até window_days do pagamento. Vale a
+        # que aceita o valor pago (dentro de amount_tolerance), depois a de vencimento mais próximo e,
+        # por fim, a de valor mais próximo (ex.: dois cartões do mesmo banco vencendo no mesmo dia)
+        payments = payments.reset_index(drop=True)
+        pairs = payments.reset_index().merge(bills[keys + ["due_date", "bill_id", "projected_amount"]], on=keys)
+        gap = (pairs["paid_amount"] - pairs["projected_amount"]).abs()
+        pairs = pairs.assign(
+            distance=(pairs["paid_date"] - pairs["due_date"]).abs(),
+            gap=gap,
+            misfit=(pairs["projected_amount"] != 0) & (gap > pairs["projected_amount"] * self.amount_tolerance),
+        )
+        pairs = pairs[pairs["distance"] <= pd.Timedelta(days=self.window_days)]
+        best = pairs.sort_values(["misfit", "distance", "gap"], kind="stable").drop_duplicates("index")
+        return payments.assign(bill_id=best.set_index("index")["bill_id"].reindex(payments.index).to_numpy())
+
+    def reconcile(self, statement, bills):
+        payments = self.find_payments(statement)
+        bills = pd.DataFrame({
+            "bill_id": range(len(bills)),
+            "bank": bills["bank"].str.lower().to_numpy(),
+            "name": bills["name"].to_numpy(),
+            "last_digits": bills["last_digits"].astype(str).to_numpy(),
+            "due_date": pd.to_datetime(bills["due_date"]).to_numpy(),
+            "projected_amount": bills["amount"].astype(float).to_numpy(),
+        })
+
+        # Cada pagamento fica com uma fatura do mesmo cartão (ou do mesmo banco, quando o final não
+        # aparece) dentro da janela. Pagamentos sem banco identificado ficam sem fatura
+        identified = payments["bank"].notna()
+        with_digits = payments["last_digits"].notna() & identified
+        matched = pd.concat([
+            self.match_bills(payments[with_digits], bills, ["bank", "last_digits"]),
+            self.match_bills(payments[~with_digits & identified], bills, ["bank"]),
+            payments[~identified].assign(bill_id=pd.NA),
+        ], ignore_index=True)
+
+        # Pagamentos parcelados somam na mesma fatura; a tolerância vale para o total pago.
+        # Faturas com valor 0 (ainda não estimadas) aceitam qualquer valor
+        matched["bill_id"] = matched["bill_id"].astype("Int64")
+        paid = matched.groupby("bill_id")["paid_amount"].sum()
+        # map mantém o índice de paid (reindex pode trocá-lo por um RangeIndex, que não se compara com Int64)
+        projected = paid.index.to_series().map(bills.set_index("bill_id")["projected_amount"])
+        within = (projected == 0) | ((paid - projected).abs() <= projected * self.amount_tolerance)
+        accepted = matched["bill_id"].isin(within[within].index)
+        matched.loc[~accepted, "bill_id"] = pd.NA
+
+        reconciled = bills.merge(
+            matched[accepted].drop(columns=["bank", "last_digits"]), on="bill_id", how="left",
+        )
+        reconciled["difference"] = (
+            reconciled["bill_id"].map(paid[within]) - reconciled["projected_amount"]
+        ).round(2)
+        reconciled["status"] = reconciled["paid_amount"].notna().map({True: "conciliada", False: "pendente"})
+
+        unmatched = matched[~accepted].assign(status="pagamento_sem_fatura")
+        unmatched = unmatched.merge(
+            bills.drop_duplicates(["bank", "last_digits"])[["bank", "last_digits", "name"]],
+            on=["bank", "last_digits"], how="left",
+        )
+        report = pd.concat([reconciled, unmatched], ignore_index=True)
+        report = report.sort_values(["due_date", "paid_date", "bank"], na_position="last", kind="stable")
+        report["due_date"] = report["due_date"].dt.date
+        report["paid_date"] = report["paid_date"].dt.date
+        return report[REPORT_COLUMNS].reset_index(drop=True)
@@ -1,22 +1,154 @@
-
+import argparse
+from datetime import datetime
 from pathlib import Path
-from extractors import FillcashExtractor
+import yaml
+from extractors import FillcashExtractor, PARSER_VERSION
 from formatter import FillcashFormatter
+from pipeline import PipelineRunner, Stage
+from reconciliation import CardBillReconciler
+from storage import ArtifactStore
+from instrumentation import recorder
+
+CARD_COLUMN_KEYS = ["cards[].bank", "cards[].name", "cards[].last_digits"]
+
+
+def reconciliation_enabled(config):
+    return (config.get("reconciliation", {}) or {}).get("enabled", False)
+
+
+def stage_names(config):
+    # Mesma ordem de build_stages; reconcile só existe com a conciliação ligada
+    names = ["extract", "build", "format"]
+    if reconciliation_enabled(config):
+        names.insert(1, "reconcile")
+    return names
+
+
+def load_config(workspace):
+    with open(Path(workspace) / "config.yml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def build_stages(workspace, config):
+    extractor = FillcashExtractor(workspace / "config.yml")
+    formatter = FillcashFormatter(workspace)
+    store = ArtifactStore(config, workspace / "outputs")
+    bills_path = workspace / "statements" / "future_card_bills.xlsx"
+
+    def load_bills():
+        if not hasattr(formatter, "future_card_bills"):
+            formatter.future_card_bills = formatter.load_future_card_bills()
+
+    def reconcile():
+        print("▶️ Executando reconcile...")
+        load_bills()
+        CardBillReconciler(config, workspace).run(formatter.future_card_bills)
+
+    def build():
+        print("▶️ Executando build...")
+        load_bills()
+        formatter.build_cash_flow()
+
+    def format_sheet():
+        print("▶️ Executando format...")
+        load_bills()
+        formatter.format_sheet()
+
+    # Cada etapa declara os arquivos e as partes do config.yml que realmente lê
+    stages = [
+        Stage(
+            "extract", extractor.run,
+            inputs=lambda: [path for _, path in extractor.resolve_jobs()] + extractor.registry.plugin_files,
+            config_keys=[
+                "accounts", "bankname", "statement_format", "ledger", "storage", "categories", "itau_pdf_parser",
+                "plugins_dir", "sniff_kb",
+            ],
+            outputs=[store.path("current_account_statement")],
+            params={"parser_version": PARSER_VERSION},
+        ),
+        Stage(
+            "build", build,
+            inputs=[store.path("current_account_statement"), bills_path],
+            config_keys=CARD_COLUMN_KEYS + [
+                "fixed_income", "fixed_expenses", "day_rollover", "storage", "reconciliation", "scenarios",
+                "cash_flow",
+            ],
+            outputs=[store.path("silver_statements")],
+            params={"year": datetime.today().year},
+        ),
+        Stage(
+            "format", format_sheet,
+            inputs=[store.path("silver_statements"), store.path("current_account_statement"), bills_path],
+            config_keys=[
+                "cards", "excel_writer", "balance_mode", "storage", "reconciliation", "scenarios",
+                "fixed_income", "day_rollover", "cash_flow",
+            ],
+            outputs=lambda: [formatter.sheet_output_path()],
+        ),
+    ]
+    if reconciliation_enabled(config):
+        # Entre extract e build: o build e o format passam a depender do relatório de conciliação
+        reconciliation_path = store.path("card_bill_reconciliation")
+        stages.insert(1, Stage(
+            "reconcile", reconcile,
+            inputs=[store.path("current_account_statement"), bills_path],
+            config_keys=["cards", "accounts", "bankname", "reconciliation"],
+            outputs=[reconciliation_path],
+        ))
+        stages[2].inputs.append(reconciliation_path)
+        stages[3].inputs.append(reconciliation_path)
+    return stages
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Pipeline de extratos e fluxo de caixa")
+    parser.add_argument("--force", action="store_true", help="Executa todas as etapas, mesmo sem alterações")
+    parser.add_argument(
+        "--from-stage", choices=["extract", "reconcile", "build", "format"],
+        help="Força a execução a partir desta etapa",
+    )
+    parser.add_argument("--metrics", help="Arquivo JSON-lines com as métricas por etapa (padrão: outputs/metrics.jsonl)")
+    parser.add_argument("--profile", action="store_true", help="Grava um dump cProfile (.pstats) por etapa em outputs/profiles")
+    parser.add_argument("--watch", action="store_true", help="Fica monitorando statements/ e config.yml e reprocessa a cada alteração")
+    parser.add_argument("--interval", type=float, default=2.0, help="Intervalo de verificação do --watch, em segundos")
+    parser.add_argument("--debounce", type=float, default=3.0, help="Espera sem novas alterações antes de reprocessar, em segundos")
+    return parser
+
+
+def parse_args(argv=None, workspace=Path(".")):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # As opções de --from-stage dependem do config.yml (reconcile só existe com a conciliação ligada)
+    if args.from_stage is not None:
+        names = stage_names(load_config(workspace))
+        if args.from_stage not in names:
+            parser.error(f"etapa indisponível com o config.yml atual: {args.from_stage} (use {', '.join(names)})")
+    return args
+
+
+def run(workspace=Path("."), force=False, from_stage=None, metrics_path=None, profile=False):
+    workspace = Path(workspace)
+    config = load_config(workspace)
+
+    outputs = workspace / "outputs"
+    recorder.configure(metrics_path or outputs / "metrics.jsonl", outputs / "profiles" if profile else None)
 
-def main():
-    config_path = Path("config.yml")
-    
     print("=== 🏦 INICIANDO PIPELINE DE EXTRATO ===")
-    
-    # Etapa 1: Extração
-    extractor = FillcashExtractor(config_path)
-    extractor.run()
 
-    # Etapa 2: Pós-processamento (build + format)
-    formatter = FillcashFormatter()
-    formatter.run()
+    runner = PipelineRunner(build_stages(workspace, config), config, outputs / ".pipeline_state.json")
+    runner.run(force=force, from_stage=from_stage)
 
     print("✅ Pipeline finalizado com sucesso.")
 
+
+def main():
+    args = parse_args()
+    if args.watch:
+        from watch import watch
+
+        watch(interval=args.interval, debounce=args.debounce)
+        return
+    run(force=args.force, from_stage=args.from_stage, metrics_path=args.metrics, profile=args.profile)
+
 if __name__ == "__main__":
     main()
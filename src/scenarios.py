@@ -0,0 +1,101 @@
+from schedule import expand_recurring
+from lazy_import import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+
+def next_income_date(config, after, end):
+    # Próxima ocorrência (depois de `after`) da entrada fixa usada como "salário" nos cenários:
+    # scenarios.income pelo nome ou, se não informado, a de maior valor
+    incomes = config.get("fixed_income", []) or []
+    name = (config.get("scenarios", {}) or {}).get("income")
+    candidates = [entry for entry in incomes if entry.get("name") == name] if name else incomes
+    if not candidates:
+        return None
+    entry = max(candidates, key=lambda item: item["amount"])
+    occurrences = expand_recurring([entry], "inflow", after, end, config.get("day_rollover", "roll_forward"))
+    dates = occurrences["date"][occurrences["date"] > pd.Timestamp(after)]
+    return dates.min().date() if len(dates) else None
+
+
+def risk_before_income(dates, first_negative, last_real_date, config):
+    # (data da próxima entrada fixa, chance de o saldo ficar negativo antes dela) a partir das colunas
+    # scenario_* do silver. A entrada é procurada depois do último dia real do extrato: com linhas por
+    # semana ou mês, o rótulo do período anterior já ficou para trás
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    simulated_from = max(pd.Timestamp(last_real_date), dates[0] - pd.Timedelta(days=1))
+    income_date = next_income_date(config, simulated_from, dates[-1])
+    if income_date is None:
+        return None, None
+    return income_date, float(np.asarray(first_negative)[dates < pd.Timestamp(income_date)].sum())
+
+
+class ScenarioEngine:
+    def __init__(self, config):
+        settings = config.get("scenarios", {}) or {}
+        self.enabled = settings.get("enabled", False)
+        self.paths = int(settings.get("paths", 2000))
+        self.seed = settings.get("seed")
+        # Desvio relativo de cada tipo de lançamento projetado (normal truncada em zero)
+        self.volatility = {
+            "bill": settings.get("bill_volatility", 0.2),
+            "income": settings.get("income_volatility", 0.05),
+            "expense": settings.get("expense_volatility", 0.0),
+        }
+        # Chance de uma entrada fixa não acontecer no mês (renda irregular)
+        self.income_miss_probability = settings.get("income_miss_probability", 0.02)
+        self.percentiles = settings.get("percentiles", [5, 50, 95])
+
+    def simulate(self, balance, events):
+        # balance: saldo determinístico por dia; events: day (posição na grade), amount (efeito no
+        # saldo, negativo para saídas) e kind. Retorna a matriz cenários × dias de saldos
+        rng = np.random.default_rng(self.seed)
+        amounts = events["amount"].to_numpy(dtype=float)
+        volatility = events["kind"].map(self.volatility).to_numpy(dtype=float)
+
+        shocks = 1 + volatility[:, None] * rng.standard_normal((len(events), self.paths))
+        simulated = amounts[:, None] * np.clip(shocks, 0, None)
+        income = (events["kind"] == "income").to_numpy()
+        if self.income_miss_probability and income.any():
+            missed = rng.random((int(income.sum()), self.paths)) < self.income_miss_probability
+            simulated[income] = np.where(missed, 0.0, simulated[income])
+
+        # Só os desvios em relação à projeção são acumulados por cima do saldo determinístico
+        deviations = np.zeros((self.paths, len(balance)))
+        np.add.at(deviations.T, events["day"].to_numpy(), simulated - amounts[:, None])
+        return np.asarray(balance, dtype=float)[None, :] + np.cumsum(deviations, axis=1)
+
+    def summarize(self, paths, start):
+        # Faixas de percentis por dia e distribuição do primeiro dia com saldo negativo
+        # (dias anteriores a `start` são reais e não contam como risco)
+        bands = np.percentile(paths, self.percentiles, axis=0)
+        negative = paths < 0
+        negative[:, :start] = False
+        went_negative = negative.any(axis=1)
+        first_negative = negative.argmax(axis=1)[went_negative]
+        first_share = np.bincount(first_negative, minlength=paths.shape[1]) / len(paths)
+        return bands, first_share
+
+    def add_columns(self, df, dates, events, last_real_date, config):
+        dates = pd.DatetimeIndex(dates)
+        start = int(dates.searchsorted(pd.Timestamp(last_real_date), side="right"))
+        # Posição de cada evento na grade: o próprio dia ou, com linhas por semana/mês, o período dele
+        events = events.assign(day=dates.searchsorted(pd.to_datetime(events["date"])))
+        events = events[(events["day"] >= start) & (events["day"] < len(dates)) & (events["amount"] != 0)]
+
+        paths = self.simulate(df["balance"].to_numpy(), events)
+        bands, first_share = self.summarize(paths, start)
+        for percentile, band in zip(self.percentiles, bands):
+            df[f"scenario_p{percentile}"] = band.round(2)
+        df["scenario_first_negative"] = first_share
+        df["scenario_negative_probability"] = first_share.cumsum().round(6)
+        df["scenario_simulated"] = np.arange(len(df)) >= start
+
+        income_date, probability = risk_before_income(dates, df["scenario_first_negative"], last_real_date, config)
+        if income_date is not None:
+            print(
+                f"🎲 {self.paths} cenários: {probability:.1%} de chance de saldo negativo "
+                f"antes da próxima entrada fixa ({income_date:%d/%m/%Y})"
+            )
+        return df
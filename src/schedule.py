@@ -0,0 +1,65 @@
+from lazy_import import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+# Como tratar dias que não existem no mês (ex.: day: 31 em abril)
+#   roll_forward: passa para o primeiro dia do mês seguinte
+#   last_day:     usa o último dia do próprio mês
+#   skip:         ignora o mês (comportamento antigo)
+ROLLOVER_MODES = ("roll_forward", "last_day", "skip")
+
+
+def monthly_dates(days, start, end, rollover="roll_forward"):
+    # Retorna (entry_index, dates), com uma posição por ocorrência de cada dia do mês
+    if rollover not in ROLLOVER_MODES:
+        raise ValueError(f"day_rollover inválido: {rollover} (use {', '.join(ROLLOVER_MODES)})")
+
+    days = np.asarray(days, dtype=np.int64)
+    months = pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq="M")
+    month_starts = months.to_timestamp().values.astype("datetime64[D]")
+    days_in_month = months.days_in_month.to_numpy()
+
+    # Matriz entradas × meses, calculada de uma vez
+    entry_index = np.repeat(np.arange(len(days)), len(months))
+    day = np.repeat(days, len(months))
+    month_start = np.tile(month_starts, len(days))
+    month_days = np.tile(days_in_month, len(days))
+
+    overflow = day > month_days
+    if rollover == "last_day":
+        offset = np.minimum(day, month_days) - 1
+    else:
+        offset = np.where(overflow, month_days, day - 1)
+    dates = month_start + offset.astype("timedelta64[D]")
+
+    keep = (dates >= np.datetime64(pd.Timestamp(start).date())) & (dates <= np.datetime64(pd.Timestamp(end).date()))
+    if rollover == "skip":
+        keep &= ~overflow
+    return entry_index[keep], dates[keep]
+
+
+def expand_recurring(entries, column, start, end, rollover="roll_forward"):
+    if not entries:
+        return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "column": [], "amount": [], "account": []})
+    entry_index, dates = monthly_dates([entry["day"] for entry in entries], start, end, rollover)
+    amounts = np.array([float(entry["amount"]) for entry in entries])
+    accounts = np.array([entry.get("account") for entry in entries], dtype=object)
+    return pd.DataFrame({
+        "date": pd.to_datetime(dates),
+        "column": column,
+        "amount": amounts[entry_index],
+        "account": accounts[entry_index],
+    })
+
+
+def scatter_events(dates, columns, events):
+    # Soma todos os eventos (date, column, amount) na grade diária dates × columns de uma vez
+    grid = np.zeros((len(dates), len(columns)))
+    if len(events) == 0:
+        return grid
+    day_index = pd.DatetimeIndex(dates).get_indexer(pd.to_datetime(events["date"]))
+    column_index = pd.Index(columns).get_indexer(events["column"])
+    valid = (day_index >= 0) & (column_index >= 0)
+    np.add.at(grid, (day_index[valid], column_index[valid]), events["amount"].to_numpy()[valid])
+    return grid
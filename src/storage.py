@@ -0,0 +1,153 @@
+import csv
+import os
+import threading
+from pathlib import Path
+from lazy_import import LazyModule
+
+pd = LazyModule("pandas")
+
+
+class ArtifactStore:
+    def __init__(self, config, base_dir: Path = Path("outputs")):
+        storage = config.get("storage", {}) or {}
+        self.base_dir = Path(base_dir)
+        self.format = storage.get("format", "csv").lower()
+        self.csv_export = storage.get("csv_export", True)
+        if self.format not in ("csv", "parquet"):
+            raise ValueError(f"Formato de armazenamento não suportado: {self.format}")
+
+    def path(self, name, fmt=None):
+        return self.base_dir / f"{name}.{fmt or self.format}"
+
+    def write(self, df, name, date_columns=("date",)):
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        if self.format == "parquet":
+            typed_dates(df, date_columns).to_parquet(self.path(name), index=False)
+        if self.format == "csv" or self.csv_export:
+            df.to_csv(self.path(name, "csv"), sep="|", index=False)
+        return self.path(name)
+
+    def open_chunks(self, name, date_columns=("date",)):
+        # Mesmo resultado de write, mas recebendo o DataFrame em blocos
+        return ChunkedArtifact(self, name, date_columns)
+
+    def write_rows(self, rows, columns, name):
+        # Grava linhas já prontas sem passar pelo pandas (caminho leve da extração); só em CSV
+        if self.format != "csv":
+            raise ValueError(f"write_rows não suporta o formato {self.format}")
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(name, "csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter="|", lineterminator=os.linesep)
+            writer.writerow(columns)
+            writer.writerows(rows)
+        return path
+
+    def read(self, name, date_columns=("date",), text_columns=()):
+        if self.format == "parquet":
+            return pd.read_parquet(self.path(name), memory_map=True)
+        # Colunas de texto que parecem números (ex.: final do cartão "0123") não podem virar float
+        df = pd.read_csv(self.path(name, "csv"), sep="|", dtype={col: str for col in text_columns})
+        for col in date_columns:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col]).dt.date
+        return df
+
+
+def typed_dates(df, date_columns):
+    # Datas vão como date32 e valores como float64, sem conversões de texto entre etapas
+    df = df.copy()
+    for col in date_columns:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col]).dt.date
+    return df
+
+
+class ParquetChunkWriter:
+    # Parquet gravado bloco a bloco num arquivo temporário, que só substitui o destino no close
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+        self.writer = None
+        self.schema = None
+        self.empty = None
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.writer is None and not len(df):
+            # Num bloco vazio as colunas de data não têm tipo: o esquema vem do primeiro bloco com linhas
+            self.empty = df
+            return
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        if self.writer is None:
+            # Colunas só com nulos no primeiro bloco (ex.: category sem nenhuma regra casada) viram texto
+            self.schema = pa.schema(
+                [field.with_type(pa.large_string()) if pa.types.is_null(field.type) else field for field in table.schema],
+                metadata=table.schema.metadata,
+            )
+            table = table.cast(self.schema)
+            self.writer = pq.ParquetWriter(self.tmp_path, self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is None:
+            (self.empty if self.empty is not None else pd.DataFrame()).to_parquet(self.tmp_path, index=False)
+        else:
+            self.writer.close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class ChunkedArtifact:
+    def __init__(self, store, name, date_columns):
+        self.store = store
+        self.date_columns = date_columns
+        self.rows = 0
+        self.parquet = None
+        self.csv_file = None
+        store.base_dir.mkdir(parents=True, exist_ok=True)
+        if store.format == "parquet":
+            self.parquet = ParquetChunkWriter(store.path(name))
+        if store.format == "csv" or store.csv_export:
+            self.csv_path = store.path(name, "csv")
+            self.csv_tmp_path = self.csv_path.with_name(f"{self.csv_path.name}.{threading.get_ident()}.tmp")
+            self.csv_file = open(self.csv_tmp_path, "w", encoding="utf-8", newline="")
+        self.path = store.path(name)
+        self.header_written = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, df):
+        if self.parquet is not None:
+            self.parquet.write(typed_dates(df, self.date_columns))
+        if self.csv_file is not None:
+            df.to_csv(self.csv_file, sep="|", index=False, header=not self.header_written)
+        self.header_written = True
+        self.rows += len(df)
+
+    def close(self):
+        if self.parquet is not None:
+            self.parquet.close()
+        if self.csv_file is not None:
+            self.csv_file.close()
+            os.replace(self.csv_tmp_path, self.csv_path)
+
+    def discard(self):
+        if self.parquet is not None:
+            self.parquet.discard()
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_tmp_path.unlink(missing_ok=True)
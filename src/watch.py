@@ -0,0 +1,84 @@
+import asyncio
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+
+class StatementWatcher:
+    def __init__(self, workspace=Path("."), interval=2.0, debounce=3.0):
+        self.workspace = Path(workspace)
+        self.interval = interval
+        self.debounce = debounce
+
+    def snapshot(self):
+        # (mtime, tamanho) do config.yml e de todos os arquivos em statements/
+        files = {}
+        config_path = self.workspace / "config.yml"
+        if config_path.exists():
+            stat = config_path.stat()
+            files[str(config_path)] = (stat.st_mtime_ns, stat.st_size)
+        for root, _, names in os.walk(self.workspace / "statements"):
+            for name in names:
+                if name.startswith(".") or name.startswith("~$"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def run_pipeline(self):
+        # Roda numa thread: o processo continua aquecido (pandas, openpyxl e pdfplumber já importados)
+        # e as etapas sem alterações são puladas pelas impressões digitais do PipelineRunner
+        from run_pipeline import run
+
+        try:
+            run(self.workspace)
+        except Exception:
+            traceback.print_exc()
+            print("❌ Execução falhou; aguardando novas alterações")
+
+    async def take_snapshot(self):
+        # Varredura dos arquivos fora do event loop (asyncio.to_thread só existe a partir do Python 3.9)
+        return await asyncio.get_running_loop().run_in_executor(None, self.snapshot)
+
+    async def wait_until_stable(self, current):
+        # Debounce: só segue quando nada mudou durante `debounce` segundos (ex.: cópia de vários arquivos)
+        while True:
+            await asyncio.sleep(self.debounce)
+            latest = await self.take_snapshot()
+            if latest == current:
+                return current
+            current = latest
+
+    async def watch(self):
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1)
+        print(f"👀 Monitorando {self.workspace / 'config.yml'} e {self.workspace / 'statements'} (Ctrl+C para sair)")
+
+        previous = await self.take_snapshot()
+        await loop.run_in_executor(executor, self.run_pipeline)
+        while True:
+            await asyncio.sleep(self.interval)
+            current = await self.take_snapshot()
+            if current == previous:
+                continue
+
+            current = await self.wait_until_stable(current)
+            changed = sorted(
+                path for path in set(previous) | set(current) if previous.get(path) != current.get(path)
+            )
+            previous = current
+            print(f"🔔 {datetime.now():%H:%M:%S} {len(changed)} arquivo(s) alterado(s): {', '.join(changed)}")
+            await loop.run_in_executor(executor, self.run_pipeline)
+
+
+def watch(workspace=Path("."), interval=2.0, debounce=3.0):
+    try:
+        asyncio.run(StatementWatcher(workspace, interval, debounce).watch())
+    except KeyboardInterrupt:
+        print("👋 Monitoramento encerrado")
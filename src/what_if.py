@@ -0,0 +1,169 @@
+from lazy_import import LazyModule
+from schedule import expand_recurring
+from cash_flow import projected_after_real
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+# Listas do config.yml com itens fixos -> coluna e sinal do efeito no saldo
+RECURRING_KINDS = {"fixed_income": ("inflow", 1.0), "fixed_expenses": ("outflow", -1.0)}
+
+
+class FenwickTree:
+    # Somas de prefixo com atualização de um ponto, ambas em O(log n)
+    def __init__(self, values):
+        tree = [float(value) for value in values]
+        for index in range(len(tree)):
+            parent = index | (index + 1)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def add(self, index, delta):
+        tree = self.tree
+        while index < len(tree):
+            tree[index] += delta
+            index |= index + 1
+
+    def prefix_sum(self, index):
+        # Soma de values[0..index]
+        tree = self.tree
+        total = 0.0
+        while index >= 0:
+            total += tree[index]
+            index = (index & (index + 1)) - 1
+        return total
+
+
+class WhatIf:
+    # Perguntas "e se" sobre o fluxo de caixa diário do build: cada mudança em item fixo ou fatura
+    # altera só os dias em que ele cai, e o saldo de qualquer dia sai de uma soma de prefixo, sem
+    # refazer o pipeline. Só o futuro muda: itens fixos e faturas depois do último dia real
+    def __init__(self, model, config, statement):
+        self.start = model.start
+        self.end = model.end
+        self.dates = pd.date_range(model.start, model.end)
+        self.months = self.dates.strftime("%Y-%m").to_numpy()
+        self.statement = statement
+        self.rollover = config.get("day_rollover", "roll_forward")
+
+        # Efeito líquido de cada dia no saldo: entradas somam, saídas e faturas subtraem
+        events = model.events
+        positions = (events["date"] - model.start).dt.days.to_numpy()
+        effect = np.where(events["column"] == "inflow", events["amount"], -events["amount"])
+        self.base = np.zeros(len(self.dates))
+        np.add.at(self.base, positions, effect)
+
+        # Faturas projetadas por (coluna do cartão, dia)
+        future = (events["column"].isin(model.card_columns) & (events["date"] > pd.Timestamp(statement["date"].max())))
+        bills = events[future].assign(position=positions[future.to_numpy()])
+        self.base_bills = bills.groupby(["column", "position"])["amount"].sum().to_dict()
+        # Cartão pelo nome da coluna, pelo nome do cartão ou pelo final
+        self.card_keys = {}
+        for card, column in zip(config.get("cards", []), model.card_columns):
+            for key in (column, str(card["name"]).lower(), str(card["last_digits"])):
+                self.card_keys[key] = column
+
+        # Posições das ocorrências projetadas de cada item fixo, calculadas uma única vez: mudar só
+        # o valor não precisa expandir o item de novo
+        self.base_recurring = {}
+        for kind in RECURRING_KINDS:
+            for entry in config.get(kind, []) or []:
+                self.base_recurring[entry["name"]] = (kind, dict(entry), self.occurrences(kind, entry))
+        self.reset()
+
+    def reset(self):
+        # Volta ao fluxo de caixa do pipeline, descartando todas as mudanças
+        self.net = self.base.copy()
+        self.tree = FenwickTree(self.net)
+        self.bills = dict(self.base_bills)
+        self.recurring = {name: (kind, dict(entry), positions) for name, (kind, entry, positions) in self.base_recurring.items()}
+        return self
+
+    def occurrences(self, kind, entry):
+        column, _ = RECURRING_KINDS[kind]
+        recurring = expand_recurring([entry], column, self.start, self.end, self.rollover)
+        dates = projected_after_real(recurring, self.statement)["date"]
+        return (dates - self.start).dt.days.to_numpy()
+
+    def apply(self, positions, delta):
+        for position in positions.tolist():
+            self.net[position] += delta
+            self.tree.add(position, delta)
+
+    def position(self, date):
+        position = (pd.Timestamp(date) - self.start).days
+        if not 0 <= position < len(self.dates):
+            raise ValueError(f"Data fora do horizonte do fluxo de caixa: {date}")
+        return position
+
+    def card_column(self, card):
+        column = self.card_keys.get(str(card)) or self.card_keys.get(str(card).lower())
+        if column is None:
+            raise ValueError(f"Cartão não encontrado: {card}")
+        return column
+
+    def set_recurring(self, name, amount=None, day=None):
+        if name not in self.recurring:
+            raise ValueError(f"Item fixo não encontrado: {name}")
+        kind, entry, positions = self.recurring[name]
+        _, sign = RECURRING_KINDS[kind]
+        self.apply(positions, -sign * float(entry["amount"]))
+        if amount is not None:
+            entry["amount"] = amount
+        if day is not None and day != entry["day"]:
+            entry["day"] = day
+            positions = self.occurrences(kind, entry)
+        self.apply(positions, sign * float(entry["amount"]))
+        self.recurring[name] = (kind, entry, positions)
+        return self
+
+    def add_recurring(self, kind, entry):
+        if kind not in RECURRING_KINDS:
+            raise ValueError(f"Tipo de item fixo inválido: {kind} (use {', '.join(RECURRING_KINDS)})")
+        if entry["name"] in self.recurring:
+            raise ValueError(f"Item fixo já existe: {entry['name']}")
+        entry = dict(entry)
+        positions = self.occurrences(kind, entry)
+        self.apply(positions, RECURRING_KINDS[kind][1] * float(entry["amount"]))
+        self.recurring[entry["name"]] = (kind, entry, positions)
+        return self
+
+    def remove_recurring(self, name):
+        self.set_recurring(name, amount=0.0)
+        del self.recurring[name]
+        return self
+
+    def set_bill(self, card, month, amount):
+        # Fatura do cartão no mês ("2026-05"); se houver mais de uma no mês, a primeira fica com o
+        # valor novo e as demais são zeradas
+        column = self.card_column(card)
+        month = str(pd.Period(month, freq="M"))
+        keys = sorted(key for key in self.bills if key[0] == column and self.months[key[1]] == month)
+        if not keys:
+            raise ValueError(f"Fatura projetada não encontrada: {column} em {month}")
+        for key, new_amount in zip(keys, [float(amount)] + [0.0] * (len(keys) - 1)):
+            self.apply(np.array([key[1]]), self.bills[key] - new_amount)
+            self.bills[key] = new_amount
+        return self
+
+    def add_bill(self, card, due_date, amount):
+        key = (self.card_column(card), self.position(due_date))
+        self.apply(np.array([key[1]]), -float(amount))
+        self.bills[key] = self.bills.get(key, 0.0) + float(amount)
+        return self
+
+    def remove_bill(self, card, month):
+        return self.set_bill(card, month, 0.0)
+
+    def balance_at(self, date):
+        return round(self.tree.prefix_sum(self.position(date)), 2)
+
+    def balances(self):
+        return pd.Series(np.cumsum(self.net).round(2), index=self.dates.date, name="balance")
+
+    def first_negative(self, after=None):
+        # Primeiro dia com saldo negativo (a partir de `after`), ou None
+        start = self.position(after) if after is not None else 0
+        negative = np.flatnonzero(np.cumsum(self.net)[start:].round(2) < 0)
+        return self.dates[start + negative[0]].date() if len(negative) else None
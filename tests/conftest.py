@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+# Os módulos do pipeline são importados pelo nome, como ao rodar os scripts de dentro de src/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import pandas as pd  # noqa: E402
+
+
+def make_statement(rows, account="itau"):
+    # Extrato consolidado a partir de (data, descrição, valor): valores positivos entram, negativos saem
+    dates, descriptions, amounts = zip(*rows) if rows else ((), (), ())
+    amounts = [float(amount) for amount in amounts]
+    return pd.DataFrame({
+        "date": list(dates),
+        "description": list(descriptions),
+        "amount": amounts,
+        "inflow": [max(amount, 0.0) for amount in amounts],
+        "outflow": [max(-amount, 0.0) for amount in amounts],
+        "account": account,
+    })
+
+
+def make_bills(rows):
+    # future_card_bills a partir de (banco, nome, final, vencimento, valor)
+    columns = ["bank", "name", "last_digits", "due_date", "amount"]
+    df = pd.DataFrame(rows, columns=columns)
+    df["last_digits"] = df["last_digits"].astype(str)
+    df["amount"] = df["amount"].astype(float)
+    return df
@@ -0,0 +1,58 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+from cash_flow import CashFlowModel, cash_flow_settings, period_end
+
+COLUMNS = ["inflow", "outflow", "Itau - Black (1234)"]
+CARDS = ["Itau - Black (1234)"]
+
+
+def model(seed=0, n=500):
+    rng = np.random.default_rng(seed)
+    events = pd.DataFrame({
+        "date": pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+        "column": rng.choice(COLUMNS, n),
+        "amount": rng.integers(1, 100000, n) / 100,
+    })
+    return CashFlowModel(events, COLUMNS, CARDS, date(2026, 1, 1), date(2026, 12, 31))
+
+
+def test_balance_at_matches_daily_frame():
+    m = model()
+    daily = m.frame()
+    np.testing.assert_array_equal(m.balance_at(daily["date"]), daily["balance"].to_numpy())
+    # Antes do primeiro evento o saldo é zero
+    assert m.balance_at([date(2025, 12, 31)])[0] == 0.0
+
+
+@pytest.mark.parametrize("aggregation", ["weekly", "monthly"])
+def test_aggregated_frame_matches_daily(aggregation):
+    m = model()
+    daily = m.frame().assign(period=lambda df: period_end(df["date"], aggregation))
+    frame = m.frame(aggregation)
+    grouped = daily.groupby("period")
+    assert frame["balance"].tolist() == grouped["balance"].last().round(2).tolist()
+    for column in COLUMNS:
+        np.testing.assert_allclose(frame[column], grouped[column].sum())
+    # Menor saldo do período: o de abertura (fechamento do anterior) ou o de algum dia dentro dele
+    opening = np.concatenate([[0.0], frame["balance"].to_numpy()[:-1]])
+    lows = np.minimum(opening, grouped["balance"].min().to_numpy()).round(2)
+    np.testing.assert_array_equal(frame["min_balance"].to_numpy(), lows)
+
+
+def test_events_outside_horizon_are_dropped():
+    events = pd.DataFrame({
+        "date": pd.to_datetime(["2025-12-31", "2026-06-01", "2027-01-01"]),
+        "column": ["inflow", "inflow", "inflow"],
+        "amount": [1.0, 2.0, 4.0],
+    })
+    m = CashFlowModel(events, COLUMNS, CARDS, date(2026, 1, 1), date(2026, 12, 31))
+    assert m.frame()["balance"].iloc[-1] == 2.0
+
+
+def test_cash_flow_settings_validates_aggregation():
+    with pytest.raises(ValueError):
+        cash_flow_settings({"cash_flow": {"aggregation": "yearly"}})
+    start, end, aggregation = cash_flow_settings({"cash_flow": {"horizon_years": 2}}, today=date(2026, 5, 1))
+    assert (start.date(), end.date(), aggregation) == (date(2026, 1, 1), date(2028, 12, 31), "daily")
@@ -0,0 +1,50 @@
+import sys
+import pytest
+import benchmark
+from extractor_registry import ENTRY_POINT_GROUP, ExtractorRegistry
+
+
+@pytest.mark.parametrize("bank, generate, name", [
+    ("c6", benchmark.generate_c6_csv, "c6.csv"),
+    ("bradesco", benchmark.generate_bradesco_csv, "bradesco.csv"),
+    ("itau", benchmark.generate_itau_csv, "itau.csv"),
+    ("itau", benchmark.generate_itau_pdf, "itau.pdf"),
+])
+def test_detects_builtin_formats(tmp_path, bank, generate, name):
+    generate(tmp_path / name, 20)
+    assert ExtractorRegistry().detect(tmp_path / name) == bank
+
+
+def test_unknown_file(tmp_path):
+    (tmp_path / "notas.txt").write_text("lista de compras\n")
+    assert ExtractorRegistry().detect(tmp_path / "notas.txt") is None
+
+
+def test_plugins_dir(tmp_path):
+    (tmp_path / "plugins").mkdir()
+    (tmp_path / "plugins" / "nubank.py").write_text(
+        "def register(registry):\n"
+        "    registry.register('nubank', lambda head, path: head.startswith(b'Data,Valor,Identificador'))\n"
+    )
+    (tmp_path / "extrato.csv").write_text("Data,Valor,Identificador,Descrição\n")
+    registry = ExtractorRegistry().discover(tmp_path / "plugins")
+    assert registry.detect(tmp_path / "extrato.csv") == "nubank"
+    assert registry.plugin_files == [tmp_path / "plugins" / "nubank.py"]
+
+
+def test_entry_points(tmp_path, monkeypatch):
+    # Pacote instalado com entry point no grupo fillcash.extractors
+    dist = tmp_path / "fillcash_inter-0.1.dist-info"
+    dist.mkdir()
+    (dist / "METADATA").write_text("Metadata-Version: 2.1\nName: fillcash-inter\nVersion: 0.1\n")
+    (dist / "entry_points.txt").write_text(f"[{ENTRY_POINT_GROUP}]\ninter = fillcash_inter:register\n")
+    (tmp_path / "fillcash_inter.py").write_text(
+        "def register(registry):\n"
+        "    registry.register('inter', lambda head, path: head.startswith(b'INTER'), priority=5)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "fillcash_inter", raising=False)
+    registry = ExtractorRegistry().discover()
+    assert "inter" in registry.plugins
+    (tmp_path / "inter.csv").write_bytes(b"INTER;Data;Historico;Valor\n")
+    assert registry.detect(tmp_path / "inter.csv") == "inter"
@@ -0,0 +1,11 @@
+import os
+from benchmark import cli_import_time
+
+# Orçamento da inicialização da CLI (run_pipeline.py --help); máquinas lentas podem aumentar pela variável
+IMPORT_BUDGET_MS = float(os.environ.get("FILLCASH_IMPORT_BUDGET_MS", 300))
+
+
+def test_cli_import_budget():
+    total_ms, _, heavy = cli_import_time()
+    assert heavy == [], f"dependências pesadas carregadas só para montar a CLI: {heavy}"
+    assert total_ms <= IMPORT_BUDGET_MS
@@ -0,0 +1,50 @@
+import json
+import instrumentation
+from instrumentation import MetricsRecorder
+
+
+def test_peak_rss_growth_is_attributed_to_the_stage(tmp_path, monkeypatch):
+    # Pico do processo lido na entrada e na saída de cada etapa: 100 -> 180 (alloc), 180 -> 180 (idle)
+    peaks = iter([100.0, 180.0, 180.0, 180.0])
+    monkeypatch.setattr(instrumentation, "peak_rss_mb", lambda: next(peaks))
+    recorder = MetricsRecorder()
+    recorder.configure(metrics_path=tmp_path / "metrics.jsonl")
+    with recorder.track("alloc"):
+        pass
+    with recorder.track("idle"):
+        pass
+    records = {record["stage"]: record for record in map(json.loads, open(tmp_path / "metrics.jsonl"))}
+    assert (records["alloc"]["peak_rss_mb"], records["alloc"]["peak_rss_growth_mb"]) == (180.0, 80.0)
+    assert (records["idle"]["peak_rss_mb"], records["idle"]["peak_rss_growth_mb"]) == (180.0, 0.0)
+
+
+def test_track_without_metrics_is_a_no_op():
+    recorder = MetricsRecorder()
+    with recorder.track("extract", account="c6") as record:
+        record["rows_out"] = 1
+    assert record == {"account": "c6", "rows_out": 1}
+
+
+def test_paused_sections_are_left_out_of_the_stage(tmp_path, monkeypatch):
+    # Etapa 100 -> 200 de pico, dos quais 100 -> 170 dentro do trecho pausado
+    peaks = iter([100.0, 100.0, 170.0, 200.0])
+    monkeypatch.setattr(instrumentation, "peak_rss_mb", lambda: next(peaks))
+    clock = iter([0.0, 1.0, 4.0, 5.0])
+    monkeypatch.setattr(instrumentation.time, "perf_counter", lambda: next(clock))
+    recorder = MetricsRecorder()
+    recorder.configure(metrics_path=tmp_path / "metrics.jsonl")
+    with recorder.track("extract_c6") as record:
+        with recorder.paused(record):
+            pass
+    record = json.loads(open(tmp_path / "metrics.jsonl").read())
+    assert (record["wall_seconds"], record["paused_seconds"]) == (2.0, 3.0)
+    assert record["peak_rss_growth_mb"] == 30.0
+    assert "_paused" not in record
+
+
+def test_paused_without_metrics_is_a_no_op():
+    recorder = MetricsRecorder()
+    with recorder.track("extract") as record:
+        with recorder.paused(record):
+            pass
+    assert record == {}
@@ -0,0 +1,56 @@
+import pandas as pd
+from ledger import TransactionLedger
+
+
+def statement(days, account="itau"):
+    return pd.DataFrame({
+        "date": pd.to_datetime(days),
+        "description": [f"COMPRA {day}" for day in days],
+        "amount": [-10.0] * len(days),
+        "inflow": [0.0] * len(days),
+        "outflow": [10.0] * len(days),
+        "account": [account] * len(days),
+    })
+
+
+def test_overlapping_exports_are_deduplicated(tmp_path):
+    ledger = TransactionLedger(tmp_path / "ledger.sqlite")
+    assert ledger.upsert(statement(["2026-01-05", "2026-01-10"])) == 2
+    assert ledger.upsert(statement(["2026-01-10", "2026-01-20"])) == 1
+    assert ledger.load()["date"].tolist() == ["2026-01-05", "2026-01-10", "2026-01-20"]
+
+
+def test_identical_rows_in_one_export_are_kept(tmp_path):
+    ledger = TransactionLedger(tmp_path / "ledger.sqlite")
+    df = statement(["2026-01-05", "2026-01-05"])
+    df["description"] = "PADARIA"
+    assert ledger.upsert(df) == 2
+    assert ledger.upsert(df) == 0
+
+
+def test_backfilled_export_inside_known_range(tmp_path):
+    # Janeiro e março primeiro, fevereiro depois: fevereiro está dentro do período já registrado
+    ledger = TransactionLedger(tmp_path / "ledger.sqlite")
+    ledger.upsert(statement(["2026-01-05", "2026-01-25"]))
+    ledger.upsert(statement(["2026-03-05", "2026-03-25"]))
+    assert ledger.upsert(statement(["2026-02-05", "2026-02-25"])) == 2
+    assert ledger.load()["date"].tolist() == [
+        "2026-01-05", "2026-01-25", "2026-02-05", "2026-02-25", "2026-03-05", "2026-03-25",
+    ]
+
+
+def test_accounts_are_independent(tmp_path):
+    ledger = TransactionLedger(tmp_path / "ledger.sqlite")
+    ledger.upsert(statement(["2026-01-05"], account="itau"))
+    assert ledger.upsert(statement(["2026-01-05"], account="c6")) == 1
+
+
+def test_ingested_files_are_recorded_with_their_rows(tmp_path):
+    ledger = TransactionLedger(tmp_path / "ledger.sqlite")
+    assert not ledger.has_file("jan")
+    ledger.upsert(statement(["2026-01-05", "2026-01-10"]), file_key="jan", path="statements/itau/jan.pdf")
+    assert ledger.has_file("jan")
+    assert not ledger.has_file("fev")
+    # Reaberto (nova execução): o registro do arquivo persiste junto com as transações
+    reopened = TransactionLedger(tmp_path / "ledger.sqlite")
+    assert reopened.has_file("jan") and len(reopened.load()) == 2
@@ -0,0 +1,101 @@
+from datetime import date
+import pytest
+from conftest import make_bills, make_statement
+from formatter import FillcashFormatter, card_column_names
+from reconciliation import CardBillReconciler
+from storage import ArtifactStore
+
+CARBON = ("c6", "carbon", "9999")
+
+
+def make_config(storage_format="parquet", **reconciliation):
+    return {
+        "storage": {"format": storage_format, "csv_export": False},
+        "reconciliation": {"enabled": True, "window_days": 7, "amount_tolerance": 0.1, **reconciliation},
+        "cards": [{"bank": "c6", "name": "carbon", "last_digits": "9999", "due_day": 10}],
+    }
+
+
+def carbon_bills():
+    return make_bills([CARBON + (date(2026, 1, 10), 500.0), CARBON + (date(2026, 2, 10), 600.0)])
+
+
+def carbon_statement():
+    # O último pagamento não cita o cartão e não tem fatura: last_digits vazio no relatório
+    return make_statement([
+        (date(2026, 1, 2), "PIX RECEBIDO", 5000.0),
+        (date(2026, 1, 11), "PGTO FAT CARTAO C6 9999", -510.0),
+        (date(2026, 1, 20), "PADARIA", -30.0),
+        (date(2026, 3, 25), "PAGAMENTO FATURA", -50.0),
+    ], account="c6")
+
+
+def reconcile(tmp_path, storage_format):
+    config = make_config(storage_format)
+    store = ArtifactStore(config, tmp_path / "outputs")
+    store.write(carbon_statement(), "current_account_statement")
+    CardBillReconciler(config, tmp_path).run(carbon_bills())
+    return config, store
+
+
+def test_payment_matches_nearest_bill(tmp_path):
+    _, store = reconcile(tmp_path, "parquet")
+    report = store.read("card_bill_reconciliation")
+    assert report["status"].tolist() == ["conciliada", "pendente", "pagamento_sem_fatura"]
+    assert report["paid_amount"].iloc[0] == 510.0
+    assert report["difference"].iloc[0] == 10.0
+
+
+def test_payment_outside_tolerance_is_unmatched(tmp_path):
+    report = CardBillReconciler(make_config(amount_tolerance=0.01), tmp_path).reconcile(carbon_statement(), carbon_bills())
+    assert sorted(report["status"]) == ["pagamento_sem_fatura", "pagamento_sem_fatura", "pendente", "pendente"]
+
+
+def test_payment_without_bank_is_reported_once(tmp_path):
+    # Conta sem cartão (nome detectado pelo conteúdo) e descrição sem banco nem final
+    statement = make_statement([(date(2026, 1, 11), "PAGAMENTO FATURA", -500.0)], account="bradesco")
+    report = CardBillReconciler(make_config(), tmp_path).reconcile(statement, carbon_bills())
+    unmatched = report[report["status"] == "pagamento_sem_fatura"]
+    assert unmatched["paid_amount"].tolist() == [500.0]
+    assert report["status"].tolist().count("pendente") == 2
+
+
+def test_no_bills(tmp_path):
+    statement = make_statement([
+        (date(2026, 1, 11), "PGTO FAT CARTAO C6 9999", -500.0),
+        (date(2026, 1, 12), "PAGAMENTO FATURA", -80.0),
+    ], account="bradesco")
+    report = CardBillReconciler(make_config(), tmp_path).reconcile(statement, make_bills([]))
+    assert report["status"].tolist() == ["pagamento_sem_fatura"] * 2
+    assert report["paid_amount"].tolist() == [500.0, 80.0]
+
+
+def test_same_bank_bills_on_the_same_day_use_the_amount():
+    # Dois cartões do mesmo banco vencendo no mesmo dia; o pagamento só cita o banco
+    config = make_config()
+    config["cards"].append({"bank": "c6", "name": "basic", "last_digits": "1111", "due_day": 10})
+    bills = make_bills([
+        CARBON + (date(2026, 1, 10), 500.0),
+        ("c6", "basic", "1111", date(2026, 1, 10), 300.0),
+    ])
+    statement = make_statement([(date(2026, 1, 10), "PGTO FAT CARTAO C6", -500.0)], account="c6")
+    report = CardBillReconciler(config).reconcile(statement, bills)
+    paid = report[report["status"] == "conciliada"]
+    assert paid["last_digits"].tolist() == ["9999"]
+    assert report["status"].tolist().count("pagamento_sem_fatura") == 0
+
+
+@pytest.mark.parametrize("storage_format", ["csv", "parquet"])
+def test_bill_events_round_trip(tmp_path, storage_format):
+    # No CSV o final do cartão volta como texto: "C6 - Carbon (9999)", não "(9999.0)"
+    config, store = reconcile(tmp_path, storage_format)
+    formatter = FillcashFormatter(tmp_path)
+    formatter.future_card_bills = carbon_bills()
+    events = formatter.bill_events(store, config)
+    column = card_column_names(carbon_bills()).iloc[0]
+    assert column == "C6 - Carbon (9999)"
+    assert set(events["column"]) == {column, "outflow"}
+    # O pagamento real sai da coluna outflow e entra na do cartão: o efeito líquido no saldo é a fatura pendente
+    card = events.loc[events["column"] == column, "amount"].sum()
+    outflow = events.loc[events["column"] == "outflow", "amount"].sum()
+    assert card + outflow == 600.0
@@ -0,0 +1,28 @@
+import pytest
+import yaml
+
+from run_pipeline import parse_args, stage_names
+
+
+def write_config(workspace, reconciliation):
+    with open(workspace / "config.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump({"reconciliation": {"enabled": reconciliation}}, f)
+
+
+def test_stage_names_follow_reconciliation_setting():
+    assert stage_names({}) == ["extract", "build", "format"]
+    assert stage_names({"reconciliation": {"enabled": True}}) == ["extract", "reconcile", "build", "format"]
+
+
+def test_from_stage_reconcile_is_rejected_when_reconciliation_is_disabled(tmp_path, capsys):
+    write_config(tmp_path, reconciliation=False)
+    with pytest.raises(SystemExit) as error:
+        parse_args(["--from-stage", "reconcile"], tmp_path)
+    assert error.value.code == 2
+    assert "use extract, build, format" in capsys.readouterr().err
+
+
+def test_from_stage_reconcile_is_accepted_when_reconciliation_is_enabled(tmp_path):
+    write_config(tmp_path, reconciliation=True)
+    assert parse_args(["--from-stage", "reconcile"], tmp_path).from_stage == "reconcile"
+    assert parse_args([], tmp_path).from_stage is None
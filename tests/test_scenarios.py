@@ -0,0 +1,51 @@
+from datetime import date
+import pandas as pd
+import pytest
+from cash_flow import CashFlowModel
+from scenarios import ScenarioEngine, risk_before_income
+
+LAST_REAL_DATE = date(2026, 10, 16)
+CONFIG = {
+    "fixed_income": [{"name": "salario", "day": 15, "amount": 5000.0}],
+    "scenarios": {
+        "enabled": True, "paths": 200, "seed": 1, "income": "salario",
+        "bill_volatility": 0.0, "income_volatility": 0.0, "income_miss_probability": 0.0,
+    },
+}
+
+
+def model():
+    # Saldo real de 100 até 16/10 e uma fatura de 1000 em 20/10: todo cenário fica negativo antes do salário
+    events = pd.DataFrame({
+        "date": pd.to_datetime(["2026-10-01", "2026-10-20", "2026-11-15"]),
+        "column": ["inflow", "Itau - Black (1234)", "inflow"],
+        "amount": [100.0, 1000.0, 5000.0],
+    })
+    return CashFlowModel(events, ["inflow", "outflow", "Itau - Black (1234)"], ["Itau - Black (1234)"],
+                         date(2026, 1, 1), date(2026, 12, 31))
+
+
+def projected():
+    return pd.DataFrame({
+        "date": pd.to_datetime(["2026-10-20", "2026-11-15"]),
+        "column": ["Itau - Black (1234)", "inflow"],
+        "amount": [-1000.0, 5000.0],
+        "kind": ["bill", "income"],
+    })
+
+
+@pytest.mark.parametrize("aggregation", ["daily", "weekly", "monthly"])
+def test_risk_before_income_uses_last_real_date(aggregation):
+    # O salário de 15/10 já passou no último dia real (16/10): a próxima entrada é 15/11 em todos os níveis
+    df = model().frame(aggregation)
+    ScenarioEngine(CONFIG).add_columns(df, pd.to_datetime(df["date"]), projected(), LAST_REAL_DATE, CONFIG)
+    income_date, probability = risk_before_income(df["date"], df["scenario_first_negative"], LAST_REAL_DATE, CONFIG)
+    assert income_date == date(2026, 11, 15)
+    assert probability == pytest.approx(1.0)
+
+
+def test_seeded_scenarios_are_reproducible():
+    df = model().frame()
+    first = ScenarioEngine(CONFIG).add_columns(df.copy(), pd.to_datetime(df["date"]), projected(), LAST_REAL_DATE, CONFIG)
+    second = ScenarioEngine(CONFIG).add_columns(df.copy(), pd.to_datetime(df["date"]), projected(), LAST_REAL_DATE, CONFIG)
+    pd.testing.assert_frame_equal(first, second)
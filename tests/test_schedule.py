@@ -0,0 +1,38 @@
+from datetime import date
+import pytest
+from schedule import expand_recurring, monthly_dates
+
+ENTRY = {"name": "aluguel", "day": 31, "amount": 3000.0, "account": "itau"}
+
+
+def dates(rollover):
+    events = expand_recurring([ENTRY], "outflow", date(2026, 1, 1), date(2026, 5, 31), rollover)
+    return [day.date() for day in events["date"]]
+
+
+def test_roll_forward_moves_to_next_month():
+    assert dates("roll_forward") == [
+        date(2026, 1, 31), date(2026, 3, 1), date(2026, 3, 31), date(2026, 5, 1), date(2026, 5, 31),
+    ]
+
+
+def test_last_day_stays_in_month():
+    assert dates("last_day") == [
+        date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30), date(2026, 5, 31),
+    ]
+
+
+def test_skip_drops_short_months():
+    assert dates("skip") == [date(2026, 1, 31), date(2026, 3, 31), date(2026, 5, 31)]
+
+
+def test_invalid_rollover():
+    with pytest.raises(ValueError):
+        monthly_dates([31], date(2026, 1, 1), date(2026, 12, 31), "next_day")
+
+
+def test_occurrences_outside_range_are_dropped():
+    # Rolagem de 31/12 para 01/01 do ano seguinte fica fora do período
+    events = expand_recurring([ENTRY], "outflow", date(2026, 12, 1), date(2026, 12, 31))
+    assert [day.date() for day in events["date"]] == [date(2026, 12, 31)]
+    assert events[["column", "amount", "account"]].iloc[0].tolist() == ["outflow", 3000.0, "itau"]
@@ -0,0 +1,103 @@
+import copy
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_bills, make_statement
+from formatter import FillcashFormatter
+from storage import ArtifactStore
+from what_if import FenwickTree, WhatIf
+
+YEAR = datetime.today().year
+CONFIG = {
+    "cards": [{"bank": "itau", "name": "black", "last_digits": "1234", "due_day": 10}],
+    "fixed_income": [{"name": "salario", "day": 5, "amount": 8000.0, "account": "itau"}],
+    "fixed_expenses": [
+        {"name": "aluguel", "day": 31, "amount": 3000.0, "account": "itau"},
+        {"name": "internet", "day": 15, "amount": 120.0, "account": "itau"},
+    ],
+}
+
+
+def statement():
+    days = pd.date_range(f"{YEAR}-01-01", f"{YEAR}-03-20", freq="3D").date
+    return make_statement(
+        [(day, "SALDO", 1000.0) for day in days if day.day == 1] + [(day, "COMPRA", -50.0) for day in days]
+    )
+
+
+def bills():
+    due = pd.date_range(f"{YEAR}-01-10", periods=24, freq="MS") + pd.Timedelta(days=9)
+    amounts = np.linspace(2000.0, 4300.0, len(due))
+    return make_bills([("itau", "black", "1234", day, amount) for day, amount in zip(due.date, amounts)])
+
+
+def rebuild(tmp_path, config, card_bills):
+    # Pipeline inteiro do build (mesmo modelo usado pela planilha)
+    formatter = FillcashFormatter(tmp_path)
+    formatter.future_card_bills = card_bills
+    model, _, _ = formatter.cash_flow_model(config, ArtifactStore(config, tmp_path), statement())
+    return model
+
+
+@pytest.fixture
+def what_if(tmp_path):
+    return WhatIf(rebuild(tmp_path, CONFIG, bills()), CONFIG, statement())
+
+
+def assert_same_balances(what_if, model):
+    np.testing.assert_allclose(what_if.balances().to_numpy(), model.frame()["balance"].to_numpy(), atol=0.005)
+    assert what_if.balance_at(model.end) == pytest.approx(model.frame()["balance"].iloc[-1], abs=0.005)
+
+
+def test_fenwick_prefix_sums():
+    values = [3.0, -1.0, 4.0, 1.5, -5.0, 9.0, 2.0]
+    tree = FenwickTree(values)
+    tree.add(2, 10.0)
+    values[2] += 10.0
+    assert [tree.prefix_sum(i) for i in range(len(values))] == pytest.approx(np.cumsum(values).tolist())
+
+
+def test_reset_matches_build(tmp_path, what_if):
+    assert_same_balances(what_if, rebuild(tmp_path, CONFIG, bills()))
+
+
+def test_recurring_changes_match_rebuild(tmp_path, what_if):
+    what_if.set_recurring("aluguel", amount=3500.0, day=10)
+    what_if.add_recurring("fixed_expenses", {"name": "academia", "day": 20, "amount": 150.0, "account": "itau"})
+    what_if.remove_recurring("internet")
+
+    config = copy.deepcopy(CONFIG)
+    config["fixed_expenses"] = [
+        {"name": "aluguel", "day": 10, "amount": 3500.0, "account": "itau"},
+        {"name": "academia", "day": 20, "amount": 150.0, "account": "itau"},
+    ]
+    model = rebuild(tmp_path, config, bills())
+    assert_same_balances(what_if, model)
+    expected = model.frame().loc[lambda df: df["balance"] < 0, "date"]
+    assert what_if.first_negative() == (expected.iloc[0] if len(expected) else None)
+
+
+def test_bill_changes_match_rebuild(tmp_path, what_if):
+    month = f"{YEAR}-08"
+    what_if.set_bill("black", month, 100.0)
+    what_if.add_bill("1234", date(YEAR, 9, 25), 700.0)
+
+    card_bills = bills()
+    card_bills.loc[pd.to_datetime(card_bills["due_date"]).dt.strftime("%Y-%m") == month, "amount"] = 100.0
+    card_bills = pd.concat([card_bills, make_bills([("itau", "black", "1234", date(YEAR, 9, 25), 700.0)])], ignore_index=True)
+    assert_same_balances(what_if, rebuild(tmp_path, CONFIG, card_bills))
+
+
+def test_reset_discards_changes(tmp_path, what_if):
+    what_if.set_recurring("salario", amount=0.0).set_bill("1234", f"{YEAR}-06", 0.0).reset()
+    assert_same_balances(what_if, rebuild(tmp_path, CONFIG, bills()))
+
+
+def test_unknown_names_raise(what_if):
+    with pytest.raises(ValueError):
+        what_if.set_recurring("inexistente", amount=1.0)
+    with pytest.raises(ValueError):
+        what_if.set_bill("nubank", f"{YEAR}-06", 1.0)
+    with pytest.raises(ValueError):
+        what_if.balance_at(date(YEAR + 5, 1, 1))